@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from datetime import timedelta
+from typing import Any
 
-import requests
+import aiohttp
 from homeassistant.config_entries import ConfigEntry, ConfigEntryNotReady
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.event import async_track_time_interval
 
 from .afire_api import AfireAPI
-from .const import CONF_PASSWORD, CONF_USERNAME, DOMAIN
+from .const import CONF_PASSWORD, CONF_USERNAME, DOMAIN, REDISCOVERY_INTERVAL_SECONDS
 from .coordinator import AfireCoordinator
+from .model import DeviceRecord
+from .storage import AfireStorage, async_remove_storage
 
 PLATFORMS = ["switch", "number", "light"]
 _LOGGER = logging.getLogger(__name__)
@@ -20,31 +26,74 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     username = entry.options.get(CONF_USERNAME, entry.data[CONF_USERNAME])
     password = entry.options.get(CONF_PASSWORD, entry.data[CONF_PASSWORD])
 
+    storage = AfireStorage(hass, entry.entry_id, username)
+    await storage.async_load()
+    saved = storage.state
     api = AfireAPI(username, password)
+    # Valid saved tokens skip the logins, and backend families the account
+    # never used are left out until their periodic recheck.
+    api.restore_session(saved)
     coordinator = AfireCoordinator(hass, api)
+    saved_devices = [DeviceRecord.from_dict(device) for device in saved.get("devices", [])]
 
     try:
-        await hass.async_add_executor_job(api.login)
-        await coordinator.async_config_entry_first_refresh()
-    except requests.HTTPError as exc:
-        status = exc.response.status_code if exc.response is not None else None
-        if status in (400, 401, 403):
-            raise ConfigEntryAuthFailed("AFIRE authentication failed") from exc
-        raise ConfigEntryNotReady(f"AFIRE service unavailable: {exc}") from exc
-    except requests.RequestException as exc:
-        raise ConfigEntryNotReady(f"AFIRE service unavailable: {exc}") from exc
+        if saved_devices:
+            # Entities come up from the saved catalog straight away; discovery
+            # confirms it against the cloud once setup has finished.
+            coordinator.async_seed(saved_devices)
+        else:
+            await api.async_login()
+            await coordinator.async_config_entry_first_refresh()
     except Exception as exc:
-        message = str(exc).lower()
-        if "auth" in message or "credential" in message:
-            raise ConfigEntryAuthFailed("AFIRE authentication failed") from exc
-        raise ConfigEntryNotReady(f"AFIRE setup failed: {exc}") from exc
+        # A retried setup builds a fresh API object, so release its pools now.
+        await api.async_close()
+        raise _setup_error(exc) from exc
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+    entry_data = hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
         "api": api,
         "coordinator": coordinator,
+        "storage": storage,
     }
+    last_saved: dict[str, Any] = {"devices": None, "auth": api.auth_state()}
+
+    @callback
+    def _async_save_on_change() -> None:
+        # Listeners run on every poll tick, so only a publish that changed a
+        # device, the device set or renewed credentials schedules a write.
+        snapshot = coordinator.data
+        devices = frozenset(snapshot or ())
+        auth = api.auth_state()
+        changed = snapshot is not None and bool(snapshot.changes)
+        if changed or devices != last_saved["devices"] or auth != last_saved["auth"]:
+            last_saved.update(devices=devices, auth=auth)
+            storage.async_schedule_save(api.persistent_state)
+
+    entry.async_on_unload(coordinator.async_add_listener(_async_save_on_change))
+    _async_save_on_change()
+
+    @callback
+    def _async_rediscover(_now=None) -> None:
+        if _now is not None and api.backends_degraded:
+            # A periodic pass during an outage could not confirm anything;
+            # the next interval tries again once the host recovers.
+            _LOGGER.debug("AFIRE skipping periodic discovery while a backend is unavailable")
+            return
+        running = entry_data.get("rediscovery")
+        if running is None or running.done():
+            entry_data["rediscovery"] = hass.async_create_task(
+                _async_confirm_catalog(hass, entry, coordinator, storage)
+            )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    coordinator.async_start_push()
+    api.start_token_refresh()
+    if saved_devices:
+        _async_rediscover()
+    # Periodic discovery picks up added or removed fireplaces and rechecks
+    # backend families the account has not used so far.
+    entry.async_on_unload(
+        async_track_time_interval(hass, _async_rediscover, timedelta(seconds=REDISCOVERY_INTERVAL_SECONDS))
+    )
     return True
 
 
@@ -52,5 +101,54 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload AFIRE config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        data = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if data:
+            rediscovery = data.get("rediscovery")
+            if rediscovery is not None:
+                rediscovery.cancel()
+            await data["coordinator"].async_shutdown()
+            await data["api"].async_close()
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the saved catalog of a removed AFIRE config entry."""
+    await async_remove_storage(hass, entry.entry_id)
+
+
+async def _async_confirm_catalog(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: AfireCoordinator,
+    storage: AfireStorage,
+) -> None:
+    """Run discovery in the background and reload if the device set changed."""
+    try:
+        changed = await coordinator.async_rediscover()
+    except Exception as exc:
+        if isinstance(_setup_error(exc), ConfigEntryAuthFailed):
+            entry.async_start_reauth(hass)
+        else:
+            _LOGGER.warning("AFIRE could not confirm the device list, keeping the current one: %s", exc)
+        return
+    if changed:
+        # Platforms create entities once per setup, so a reload picks up
+        # added devices and drops removed ones.
+        _LOGGER.info("AFIRE device list changed since the last start, reloading")
+        # The reloaded entry reads the catalog back, so it must be on disk first.
+        await storage.async_save(coordinator.api.persistent_state)
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+
+
+def _setup_error(exc: Exception) -> Exception:
+    """Map a setup failure onto Home Assistant's reauth or retry exceptions."""
+    if isinstance(exc, aiohttp.ClientResponseError):
+        if exc.status in (400, 401, 403):
+            return ConfigEntryAuthFailed("AFIRE authentication failed")
+        return ConfigEntryNotReady(f"AFIRE service unavailable: {exc}")
+    if isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError)):
+        return ConfigEntryNotReady(f"AFIRE service unavailable: {exc}")
+    message = str(exc).lower()
+    if "auth" in message or "credential" in message:
+        return ConfigEntryAuthFailed("AFIRE authentication failed")
+    return ConfigEntryNotReady(f"AFIRE setup failed: {exc}")
@@ -1,10 +1,33 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any
+import time
+from typing import Any, Callable
 
+import aiohttp
+
+from .auth import TokenRefresher
 from .awpr2_api import Awpr2Backend
 from .awpr_api import AwprBackend
+from .awpr_push import AwprPushClient
+from .breaker import BackendUnavailableError, CircuitBreaker
+from .cache import StatusCache
+from .command_actor import DeviceCommandActor
+from .const import (
+    AWPR2_BULK_POLL,
+    BACKEND_CONCURRENCY_LIMITS,
+    HTTP_POOL_SIZE,
+    RATE_LIMITS,
+    SERIES_AWPR,
+    SERIES_AWPR2,
+    UNUSED_FAMILY_RECHECK_SECONDS,
+)
+from .http_session import PooledSession
+from .model import DeviceRecord
+from .ratelimit import RateLimiter, TokenBucket
+from .scheduler import PRIORITY_INTERACTIVE, RequestScheduler, request_priority
+from .singleflight import SingleFlight
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -12,97 +35,448 @@ _LOGGER = logging.getLogger(__name__)
 class AfireAPI:
     """Facade that merges AWPR and AWPR2 devices for one account."""
 
-    def __init__(self, username: str, password: str) -> None:
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        *,
+        session: aiohttp.ClientSession | None = None,
+        pool_size: int = HTTP_POOL_SIZE,
+        concurrency_limits: dict[str, int] | None = None,
+        rate_limits: dict[str, dict[str, float]] | None = None,
+    ) -> None:
         self.username = username
         self.password = password
         self.devices: list[dict[str, Any]] = []
         self._devices_by_id: dict[str, dict[str, Any]] = {}
+        # Without an explicit session every backend gets its own keep-alive
+        # pool, so polls and key presses reuse connections to its host.
+        self._pools: dict[str, PooledSession] = {}
+        if session is None:
+            self._pools = {
+                "awpr": PooledSession("awpr", pool_size),
+                "awpr2": PooledSession("awpr2", pool_size),
+            }
+        # Each backend admits requests through its own bounded priority
+        # scheduler, so a large account cannot flood either cloud host and
+        # user commands never queue behind a poll burst.
+        limits = {**BACKEND_CONCURRENCY_LIMITS, **(concurrency_limits or {})}
+        self._schedulers = {
+            "awpr": RequestScheduler("awpr", limits["awpr"]),
+            "awpr2": RequestScheduler("awpr2", limits["awpr2"]),
+        }
+        # A host that keeps failing trips its family's breaker, so polls stop
+        # waiting out timeouts and serve last-known state until a probe succeeds.
+        self._breakers = {
+            "awpr": CircuitBreaker("awpr"),
+            "awpr2": CircuitBreaker("awpr2"),
+        }
+        # Every request spends a token from its host's bucket and from one
+        # bucket shared by the whole account, so polls, key-press bursts and
+        # retries together stay under the cloud's throttling thresholds.
+        rates = {**RATE_LIMITS, **(rate_limits or {})}
+        account_bucket = TokenBucket("account", **rates["account"])
+        self._rate_limiters = {
+            "awpr": RateLimiter(account_bucket, TokenBucket("awpr", **rates["awpr"])),
+            "awpr2": RateLimiter(account_bucket, TokenBucket("awpr2", **rates["awpr2"])),
+        }
+        self._status_caches = {
+            "awpr": StatusCache("awpr"),
+            "awpr2": StatusCache("awpr2"),
+        }
         # One AFIRE account can expose fireplaces from both API families.
         self._backends = {
-            "awpr": AwprBackend(username, password),
-            "awpr2": Awpr2Backend(username, password),
+            "awpr": AwprBackend(
+                session or self._pools["awpr"].session,
+                username,
+                password,
+                scheduler=self._schedulers["awpr"],
+                breaker=self._breakers["awpr"],
+                status_cache=self._status_caches["awpr"],
+                rate_limiter=self._rate_limiters["awpr"],
+            ),
+            "awpr2": Awpr2Backend(
+                session or self._pools["awpr2"].session,
+                username,
+                password,
+                scheduler=self._schedulers["awpr2"],
+                breaker=self._breakers["awpr2"],
+                status_cache=self._status_caches["awpr2"],
+                rate_limiter=self._rate_limiters["awpr2"],
+            ),
         }
+        self._refreshers = {name: TokenRefresher(name, backend) for name, backend in self._backends.items()}
         self._enabled_backends: set[str] = set()
+        # Backend families that have returned devices for this account, and
+        # when every family was last asked. Unknown until the first discovery.
+        self._families: set[str] = set()
+        self._families_checked_at = 0.0
+        self._actors: dict[str, DeviceCommandActor] = {}
+        self._status_reads = SingleFlight()
+        self._push_clients: list[AwprPushClient] = []
+        self._push_client_by_id: dict[str, AwprPushClient] = {}
+        self._push_listener: Callable[[str, dict[str, Any]], None] | None = None
+        self._push_state_listener: Callable[[bool], None] | None = None
+
+    async def async_login(self) -> None:
+        """Authenticate against the backends this account uses.
 
-    def login(self) -> None:
-        """Authenticate against every supported backend."""
+        Saved tokens that are still valid are reused instead of logging in.
+        """
         errors: list[Exception] = []
         self._enabled_backends = set()
+        backends = self._active_backends(check_unused=False)
 
-        for name, backend in self._backends.items():
-            try:
-                backend.login()
-            except Exception as exc:
-                errors.append(exc)
-                _LOGGER.debug("AFIRE backend %s login failed: %s", name, exc)
+        # The backends live on independent hosts, so logins run side by side
+        # and one family failing never delays or blocks the other.
+        outcomes = await asyncio.gather(
+            *(backend.async_ensure_token() for backend in backends.values()),
+            return_exceptions=True,
+        )
+        for name, outcome in zip(backends, outcomes):
+            if isinstance(outcome, Exception):
+                errors.append(outcome)
+                _LOGGER.debug("AFIRE backend %s login failed: %s", name, outcome)
             else:
                 self._enabled_backends.add(name)
 
         if not self._enabled_backends:
             raise errors[-1] if errors else RuntimeError("Unable to authenticate with AFIRE backends")
 
-    def get_devices(self) -> list[dict[str, Any]]:
+    async def async_get_devices(self) -> list[dict[str, Any]]:
         """Return the merged device list across AWPR and AWPR2."""
         if not self._enabled_backends:
-            self.login()
+            await self.async_login()
 
         devices: list[dict[str, Any]] = []
         errors: list[Exception] = []
+        # A family that has never returned devices is only asked again once
+        # UNUSED_FAMILY_RECHECK_SECONDS have passed since the last full pass.
+        check_unused = time.time() - self._families_checked_at >= UNUSED_FAMILY_RECHECK_SECONDS
+        backends = self._active_backends(check_unused)
+        families: set[str] = set()
 
-        for name, backend in self._backends.items():
-            try:
-                # Discovery is best-effort per backend so one family can still
-                # work even if the other one is unavailable for this account.
-                backend_devices = backend.get_devices()
-            except Exception as exc:
-                errors.append(exc)
-                _LOGGER.debug("AFIRE backend %s discovery failed: %s", name, exc)
+        # Discovery is best-effort per backend so one family can still work
+        # even if the other one is unavailable for this account.
+        outcomes = await asyncio.gather(
+            *(backend.async_get_devices() for backend in backends.values()),
+            return_exceptions=True,
+        )
+        for name, backend_devices in zip(backends, outcomes):
+            if isinstance(backend_devices, Exception):
+                errors.append(backend_devices)
+                _LOGGER.debug("AFIRE backend %s discovery failed: %s", name, backend_devices)
+                if name in self._families:
+                    # An outage is not evidence the account stopped using it,
+                    # nor that its fireplaces were removed: they stay listed
+                    # until the family answers again.
+                    families.add(name)
+                    series = backends[name].series
+                    devices.extend(device for device in self.devices if device["series"] == series)
                 continue
 
             if backend_devices:
                 self._enabled_backends.add(name)
+                families.add(name)
                 devices.extend(backend_devices)
 
-        if not devices and errors:
+        if errors and (not devices or len(errors) == len(backends)):
             raise errors[-1]
 
+        # A family that errored has not shown it is unused: the full pass only
+        # counts once every family answered, so one left out after a failed
+        # first discovery is asked again on the next pass, even after a restart.
+        if len(backends) == len(self._backends) and not errors:
+            self._families_checked_at = time.time()
+        self._families = families
+
         self.devices = devices
         self._devices_by_id = {device["did"]: device for device in devices}
         return devices
 
-    def get_status(self, did: str) -> dict[str, Any]:
-        """Return the normalized status for one merged device."""
-        device = self._require_device(did)
+    def restore_session(self, state: dict[str, Any]) -> None:
+        """Adopt saved tokens and the backend families the account uses."""
+        for name, auth in (state.get("auth") or {}).items():
+            if name in self._backends:
+                self._backends[name].restore_auth(auth)
+        self._families = {name for name in state.get("families", []) if name in self._backends}
+        self._families_checked_at = float(state.get("families_checked_at", 0.0))
+
+    def persistent_state(self) -> dict[str, Any]:
+        """Return what a restart needs to skip login and discovery."""
+        return {
+            "devices": [device.as_dict() for device in self.devices],
+            "auth": self.auth_state(),
+            "families": sorted(self._families),
+            "families_checked_at": self._families_checked_at,
+        }
+
+    def auth_state(self) -> dict[str, Any]:
+        """Return the backend sessions a restart can reuse."""
+        return {name: backend.auth_state() for name, backend in self._backends.items()}
+
+    def get_device(self, did: str) -> DeviceRecord | None:
+        """Return the live record of a known device."""
+        return self._devices_by_id.get(did)
+
+    def restore_devices(self, devices: list[dict[str, Any]]) -> None:
+        """Adopt a saved device list without asking the cloud."""
+        self.devices = devices
+        self._devices_by_id = {device["did"]: device for device in devices}
+
+    async def async_get_status(self, did: str, fresh: bool = False) -> dict[str, Any]:
+        """Return the normalized status for one merged device.
+
+        Concurrent reads of the same device share one in-flight request. A
+        `fresh` read skips the status cache and only joins other fresh reads.
+        """
+        return await self._status_reads.run((did, fresh), lambda: self._async_read_status(did, fresh))
+
+    async def _async_read_status(self, did: str, fresh: bool) -> dict[str, Any]:
+        device = await self._async_require_device(did)
         backend = self._backend_for_device(device)
-        if device["series"] == backend.series:
+        if device["series"] != backend.series:
+            raise RuntimeError(f"Backend mismatch for device {did}")
+        try:
             if device["series"] == "AWPR2":
                 # AWPR2 parsing depends on model metadata, so the backend
                 # receives the whole normalized device instead of only the raw id.
-                attrs = backend.get_status(device)
+                attrs = await backend.async_get_status(device, fresh)
             else:
-                attrs = backend.get_status(device["backend_id"])
-        else:
-            raise RuntimeError(f"Backend mismatch for device {did}")
+                attrs = await backend.async_get_status(device["backend_id"], fresh)
+        except BackendUnavailableError:
+            if fresh:
+                # Last-known state would read as the device's answer.
+                raise
+            # The breaker refused the read: keep serving the last-known state.
+            return dict(device["attrs"])
 
         device["attrs"] = attrs
         return attrs
 
-    def set_attr(self, did: str, attrs: dict[str, Any]) -> dict[str, Any]:
-        """Apply normalized attributes to a merged device."""
-        device = self._require_device(did)
-        backend = self._backend_for_device(device)
-        result = backend.set_attr(device, attrs)
-        device["attrs"].update(result.get("attrs", {}))
+    async def async_verify_status(self, did: str) -> dict[str, Any]:
+        """Re-read a device after a command and resend dropped AWPR2 level presses.
+
+        The read goes past the status cache, so each attempt sees the cloud.
+        """
+        attrs = await self.async_get_status(did, fresh=True)
+        device = self._devices_by_id.get(did)
+        if device is None or device["series"] != SERIES_AWPR2:
+            return attrs
+        missing = self._backends["awpr2"].dropped_levels(device, attrs)
+        actor = self._actors.get(did)
+        if actor is not None:
+            # A queued command carrying a newer target wins over the correction.
+            missing = {key: value for key, value in missing.items() if not actor.superseded(key)}
+        if missing:
+            # The correction is planned from the level just read and goes
+            # through the device's actor like any other write.
+            await self.async_set_attr(did, missing)
+        return attrs
+
+    async def async_get_statuses(self, dids: list[str]) -> dict[str, dict[str, Any] | Exception]:
+        """Return statuses for many devices, batching backends that support it."""
+        devices = [self._devices_by_id[did] for did in dids if did in self._devices_by_id]
+        bulk: list[dict[str, Any]] = []
+        single: list[dict[str, Any]] = []
+        for device in devices:
+            if AWPR2_BULK_POLL and device["series"] == SERIES_AWPR2:
+                bulk.append(device)
+            else:
+                single.append(device)
+
+        # Failures are returned per device instead of raised so one unreachable
+        # fireplace cannot fail the whole poll.
+        results: dict[str, dict[str, Any] | Exception] = {
+            did: KeyError(f"Unknown AFIRE device id: {did}") for did in dids if did not in self._devices_by_id
+        }
+
+        async def poll_bulk() -> None:
+            if not bulk:
+                return
+            try:
+                statuses = await self._backends["awpr2"].async_get_statuses(bulk)
+            except BackendUnavailableError:
+                for device in bulk:
+                    results[device["did"]] = dict(device["attrs"])
+                return
+            except Exception as exc:
+                for device in bulk:
+                    results[device["did"]] = exc
+                return
+            for device in bulk:
+                attrs = statuses.get(device["backend_id"])
+                if attrs is None:
+                    results[device["did"]] = RuntimeError(f"AWPR2 device {device['did']} missing from /products")
+                    continue
+                device["attrs"] = attrs
+                results[device["did"]] = attrs
+
+        async def poll_single(device: dict[str, Any]) -> None:
+            try:
+                results[device["did"]] = await self.async_get_status(device["did"])
+            except Exception as exc:
+                results[device["did"]] = exc
+
+        await asyncio.gather(poll_bulk(), *(poll_single(device) for device in single))
+        return results
+
+    async def async_set_attr(self, did: str, attrs: dict[str, Any]) -> dict[str, Any]:
+        """Apply normalized attributes to a merged device.
+
+        Every device has one command actor, so writes are serialized and
+        rapid successive writes are merged into one net target.
+        """
+        device = await self._async_require_device(did)
+        actor = self._actors.get(did)
+        if actor is None:
+
+            async def execute(merged: dict[str, Any], superseded: Callable[[str], bool]) -> dict[str, Any]:
+                # Rediscovery replaces device records, so look up the current one.
+                return await self._async_write(self._devices_by_id.get(did, device), merged, superseded)
+
+            actor = self._actors[did] = DeviceCommandActor(did, execute)
+        return await actor.async_submit(attrs)
+
+    async def _async_write(
+        self,
+        device: dict[str, Any],
+        attrs: dict[str, Any],
+        superseded: Callable[[str], bool],
+    ) -> dict[str, Any]:
+        with request_priority(PRIORITY_INTERACTIVE):
+            if device["series"] == SERIES_AWPR2:
+                result = await self._backends["awpr2"].async_set_attr(device, attrs, superseded)
+            else:
+                result = await self._backend_for_device(device).async_set_attr(device, attrs)
+        # Attrs may be a shared immutable state, so the merge builds a new dict.
+        device["attrs"] = {**device["attrs"], **result.get("attrs", {})}
         return result
 
-    def _require_device(self, did: str) -> dict[str, Any]:
+    @property
+    def push_connected(self) -> bool:
+        """Return True when every push channel is live."""
+        return bool(self._push_clients) and all(client.connected for client in self._push_clients)
+
+    @property
+    def backends_degraded(self) -> bool:
+        """Return True while a backend family the account uses is failing."""
+        return any(self._breakers[name].is_open for name in self._families)
+
+    def has_live_push(self, did: str) -> bool:
+        """Return True when status changes for this device arrive by push."""
+        device = self._devices_by_id.get(did)
+        if device is None or device["series"] != SERIES_AWPR:
+            return False
+        client = self._push_client_by_id.get(device["backend_id"])
+        return client is not None and client.is_subscribed(device["backend_id"])
+
+    @property
+    def bulk_polled(self) -> set[str]:
+        """Return the devices refreshed together by one bulk status request."""
+        if not AWPR2_BULK_POLL:
+            return set()
+        return {device["did"] for device in self.devices if device["series"] == SERIES_AWPR2}
+
+    def start_push(
+        self,
+        on_status: Callable[[str, dict[str, Any]], None],
+        on_connection: Callable[[bool], None],
+    ) -> None:
+        """Subscribe to websocket status pushes for the known AWPR devices."""
+        endpoints: dict[tuple[str, int], list[str]] = {}
+        for device in self.devices:
+            if device["series"] == SERIES_AWPR and device.get("push_host") and device.get("push_port"):
+                endpoint = (str(device["push_host"]), int(device["push_port"]))
+                endpoints.setdefault(endpoint, []).append(device["backend_id"])
+
+        self._push_listener = on_status
+        self._push_state_listener = on_connection
+        # Bindings normally share one endpoint, but a channel is opened per
+        # distinct host/port the cloud advertises.
+        for (host, port), raw_ids in endpoints.items():
+            client = AwprPushClient(
+                self._backends["awpr"],
+                host,
+                port,
+                raw_ids,
+                self._handle_push,
+                self._handle_push_connection,
+            )
+            self._push_clients.append(client)
+            for raw_id in raw_ids:
+                self._push_client_by_id[raw_id] = client
+            client.start()
+
+    def start_token_refresh(self) -> None:
+        """Renew backend credentials in the background ahead of expiry."""
+        for refresher in self._refreshers.values():
+            refresher.start()
+
+    async def async_stop_push(self) -> None:
+        """Close every push channel."""
+        clients, self._push_clients = self._push_clients, []
+        self._push_client_by_id = {}
+        for client in clients:
+            await client.async_stop()
+
+    async def async_close(self) -> None:
+        """Close the command actors, push channels, refreshers and connection pools."""
+        actors, self._actors = self._actors, {}
+        for actor in actors.values():
+            await actor.async_stop()
+        await self.async_stop_push()
+        for refresher in self._refreshers.values():
+            await refresher.async_stop()
+        for cache in self._status_caches.values():
+            await cache.async_close()
+        for pool in self._pools.values():
+            await pool.async_close()
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return transport counters for the diagnostics download."""
+        return {
+            "enabled_backends": sorted(self._enabled_backends),
+            "families": sorted(self._families),
+            "families_checked_at": self._families_checked_at,
+            "push_channels": {client.url: client.connected for client in self._push_clients},
+            "pools": {name: pool.diagnostics() for name, pool in self._pools.items()},
+            "schedulers": {name: scheduler.diagnostics() for name, scheduler in self._schedulers.items()},
+            "latency": {name: backend.latency.diagnostics() for name, backend in self._backends.items()},
+            "breakers": {name: breaker.diagnostics() for name, breaker in self._breakers.items()},
+            "token_refresh": {name: refresher.diagnostics() for name, refresher in self._refreshers.items()},
+            "rate_limits": {name: limiter.diagnostics() for name, limiter in self._rate_limiters.items()},
+            "status_cache": {name: cache.diagnostics() for name, cache in self._status_caches.items()},
+            "status_single_flight": self._status_reads.diagnostics(),
+        }
+
+    def _handle_push(self, raw_id: str, attrs: dict[str, Any]) -> None:
+        device = self._devices_by_id.get(f"awpr:{raw_id}")
+        if device is None:
+            return
+        merged = {**device.get("attrs", {}), **attrs}
+        device["attrs"] = merged
+        self._backends["awpr"].remember_status(raw_id, merged)
+        if self._push_listener is not None:
+            self._push_listener(device["did"], merged)
+
+    def _handle_push_connection(self) -> None:
+        if self._push_state_listener is not None:
+            self._push_state_listener(self.push_connected)
+
+    async def _async_require_device(self, did: str) -> dict[str, Any]:
         if did not in self._devices_by_id:
-            self.get_devices()
+            await self.async_get_devices()
         device = self._devices_by_id.get(did)
         if device is None:
             raise KeyError(f"Unknown AFIRE device id: {did}")
         return device
 
+    def _active_backends(self, check_unused: bool) -> dict[str, Any]:
+        if check_unused or not self._families:
+            return self._backends
+        return {name: backend for name, backend in self._backends.items() if name in self._families}
+
     def _backend_for_device(self, device: dict[str, Any]):
         if device["did"].startswith("awpr2:"):
             return self._backends["awpr2"]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from .const import (
+    AUTH_REFRESH_IDLE_SECONDS,
+    AUTH_REFRESH_RETRY_SECONDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenRefresher:
+    """Renews one backend's credentials before requests find them expired.
+
+    The backend reports when its session should be renewed through
+    `token_refresh_at()`; None means there is nothing to renew yet.
+    """
+
+    def __init__(self, name: str, backend: Any) -> None:
+        self.name = name
+        self._backend = backend
+        self._task: asyncio.Task | None = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._async_run())
+
+    async def async_stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def diagnostics(self) -> dict[str, Any]:
+        refresh_at = self._backend.token_refresh_at()
+        return {
+            "refresh_in": round(max(0.0, refresh_at - time.time())) if refresh_at is not None else None,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
+
+    async def _async_run(self) -> None:
+        backoff = AUTH_REFRESH_RETRY_SECONDS
+        while True:
+            refresh_at = self._backend.token_refresh_at()
+            if refresh_at is None or time.time() < refresh_at:
+                # Requests can log in on their own in the meantime, so the
+                # deadline is re-read at least every AUTH_REFRESH_IDLE_SECONDS.
+                wait = AUTH_REFRESH_IDLE_SECONDS if refresh_at is None else refresh_at - time.time()
+                await asyncio.sleep(min(wait, AUTH_REFRESH_IDLE_SECONDS))
+                continue
+            try:
+                await self._backend.async_login()
+            except Exception as exc:
+                self.failures += 1
+                _LOGGER.debug("AFIRE %s token refresh failed: %s", self.name, exc)
+                await asyncio.sleep(AUTH_REFRESH_RETRY_SECONDS)
+                continue
+            self.refreshes += 1
+            _LOGGER.debug("AFIRE %s credentials renewed ahead of expiry", self.name)
+            renewed_at = self._backend.token_refresh_at()
+            if renewed_at is not None and renewed_at <= max(refresh_at, time.time()):
+                # The new credentials are already due (a short `expire_at` or
+                # clock skew); back off instead of logging in back-to-back.
+                _LOGGER.debug("AFIRE %s renewed credentials are already due, retrying in %ss", self.name, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, AUTH_REFRESH_IDLE_SECONDS)
+            else:
+                backoff = AUTH_REFRESH_RETRY_SECONDS
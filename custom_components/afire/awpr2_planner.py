@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .const import AWPR2_COLOR_COMMANDS
+
+# Level attributes are stepped with an up/down key pair, one press per step.
+LEVEL_KEYS = {
+    "FLAME": ("Key2", "Key3"),
+    "SPEED": ("Key4", "Key5"),
+    "BRIGHTNESS": ("Key6", "Key7"),
+}
+LEVEL_STEPS = {
+    command: (key, step)
+    for key, commands in LEVEL_KEYS.items()
+    for command, step in zip(commands, (1, -1))
+}
+COLOR_KEYS_BY_COMMAND = {command: key for key, command in AWPR2_COLOR_COMMANDS.items()}
+DEFAULT_LEVEL_RANGE = {"min": 1, "max": 8}
+
+
+def apply_command(state: dict[str, Any], command: str, ranges: dict[str, dict[str, int]] | None = None) -> dict[str, Any]:
+    """Return the fireplace state after one AWPR2 key press."""
+    state = dict(state)
+    if command == "PowON1":
+        state["POWERSW"] = 1
+    elif command == "PowON0":
+        state["POWERSW"] = 0
+        state["LED_SW"] = 0
+        _clear_rgb(state, color_sw=0)
+    elif command == "Key8":
+        state["LED_SW"] = 0 if int(state.get("LED_SW", 0)) else 1
+    elif command == "Key9":
+        state["COLOR_SW"] = 0 if int(state.get("COLOR_SW", 0)) else 1
+        if not state["COLOR_SW"]:
+            _clear_rgb(state, color_sw=0)
+    elif command == "KeyA":
+        state["RGB_PLAY"] = 0 if int(state.get("RGB_PLAY", 0)) else 1
+        if state["RGB_PLAY"]:
+            for color_key in AWPR2_COLOR_COMMANDS:
+                state[color_key] = 0
+    elif command in LEVEL_STEPS:
+        key, step = LEVEL_STEPS[command]
+        limits = (ranges or {}).get(key, DEFAULT_LEVEL_RANGE)
+        state[key] = max(limits["min"], min(limits["max"], int(state.get(key, limits["min"])) + step))
+    elif command in COLOR_KEYS_BY_COMMAND:
+        # A color key switches the RGB LEDs on by itself and stops the effect.
+        _clear_rgb(state, color_sw=1)
+        state[COLOR_KEYS_BY_COMMAND[command]] = 1
+    return state
+
+
+def plan_commands(
+    current: dict[str, Any],
+    attrs: dict[str, Any],
+    supports_rgb: bool,
+    ranges: dict[str, dict[str, int]] | None = None,
+) -> tuple[list[str], dict[str, Any]]:
+    """Return the shortest key sequence that moves `current` to `attrs`.
+
+    Requested attrs are first resolved into net targets, candidate presses
+    are generated in dependency order (power on first, RGB before effects),
+    and every press whose removal still reaches the targets on the modelled
+    state machine is dropped. The second value is the optimistic state.
+    """
+    targets = _resolve_targets(current, attrs, supports_rgb)
+    for key in LEVEL_KEYS:
+        if key in targets:
+            limits = (ranges or {}).get(key, DEFAULT_LEVEL_RANGE)
+            targets[key] = max(limits["min"], min(limits["max"], targets[key]))
+    commands = _candidate_commands(current, targets)
+
+    # Dropping one press can make another redundant (a color key already
+    # turns RGB on and stops the effect), so prune until nothing changes.
+    pruned = True
+    while pruned:
+        pruned = False
+        for index in range(len(commands)):
+            trimmed = commands[:index] + commands[index + 1 :]
+            if _reaches(current, _simulate(current, trimmed, ranges), targets):
+                commands = trimmed
+                pruned = True
+                break
+
+    final = _simulate(current, commands, ranges)
+    # Keys the device does not report (RGB keys on a non-RGB model) stay out,
+    # or the intent could never be matched by a status read.
+    optimistic = {
+        key: value
+        for key, value in final.items()
+        if key in targets or (key in current and value != current[key])
+    }
+    # Levels without a known current value cannot be stepped; they are
+    # reported as requested, matching what the device is asked to show.
+    for key in LEVEL_KEYS:
+        if key in targets and key not in current:
+            optimistic[key] = targets[key]
+    return commands, optimistic
+
+
+def _resolve_targets(current: dict[str, Any], attrs: dict[str, Any], supports_rgb: bool) -> dict[str, int]:
+    targets: dict[str, int] = {}
+    for key, value in attrs.items():
+        target = int(value)
+        if key in ("POWERSW", "LED_SW") or key in LEVEL_KEYS:
+            targets[key] = target
+        elif not supports_rgb:
+            continue
+        elif key == "COLOR_SW":
+            targets["COLOR_SW"] = target
+            if not target:
+                _drop_rgb_targets(targets)
+        elif key == "RGB_PLAY":
+            targets["RGB_PLAY"] = target
+            if target:
+                for color_key in AWPR2_COLOR_COMMANDS:
+                    targets.pop(color_key, None)
+        elif key in AWPR2_COLOR_COMMANDS and target:
+            # Later writes win: a color replaces any earlier color or effect.
+            _drop_rgb_targets(targets)
+            targets.update({"COLOR_SW": 1, "RGB_PLAY": 0, key: 1})
+
+    if targets.get("POWERSW") == 0:
+        # Powering off discards every other change anyway.
+        return {"POWERSW": 0}
+    return targets
+
+
+def _candidate_commands(current: dict[str, Any], targets: dict[str, int]) -> list[str]:
+    commands: list[str] = []
+    if targets.get("POWERSW") == 1 and not int(current.get("POWERSW", 0)):
+        commands.append("PowON1")
+    if targets.get("POWERSW") == 0 and int(current.get("POWERSW", 0)):
+        return ["PowON0"]
+
+    if "COLOR_SW" in targets and targets["COLOR_SW"] != int(current.get("COLOR_SW", 0)):
+        commands.append("Key9")
+    color_key = next((key for key in AWPR2_COLOR_COMMANDS if targets.get(key)), None)
+    if color_key is not None:
+        commands.append(AWPR2_COLOR_COMMANDS[color_key])
+    if "RGB_PLAY" in targets and targets["RGB_PLAY"] != int(current.get("RGB_PLAY", 0)):
+        commands.append("KeyA")
+    if "LED_SW" in targets and targets["LED_SW"] != int(current.get("LED_SW", 0)):
+        commands.append("Key8")
+
+    for key, (command_up, command_down) in LEVEL_KEYS.items():
+        if key not in targets or key not in current:
+            continue
+        delta = targets[key] - int(current[key])
+        commands.extend([command_up] * delta if delta > 0 else [command_down] * -delta)
+    return commands
+
+
+def _simulate(
+    current: dict[str, Any],
+    commands: list[str],
+    ranges: dict[str, dict[str, int]] | None,
+) -> dict[str, Any]:
+    state = dict(current)
+    for command in commands:
+        state = apply_command(state, command, ranges)
+    return state
+
+
+def _reaches(current: dict[str, Any], state: dict[str, Any], targets: dict[str, int]) -> bool:
+    # Levels with no known current value are never stepped, so they cannot
+    # be checked either.
+    return all(
+        int(state.get(key, 0)) == value
+        for key, value in targets.items()
+        if key not in LEVEL_KEYS or key in current
+    )
+
+
+def _clear_rgb(state: dict[str, Any], color_sw: int) -> None:
+    state["COLOR_SW"] = color_sw
+    state["RGB_PLAY"] = 0
+    for color_key in AWPR2_COLOR_COMMANDS:
+        state[color_key] = 0
+
+
+def _drop_rgb_targets(targets: dict[str, int]) -> None:
+    targets.pop("RGB_PLAY", None)
+    for color_key in AWPR2_COLOR_COMMANDS:
+        targets.pop(color_key, None)
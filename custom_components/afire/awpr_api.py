@@ -1,32 +1,37 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from typing import Any
 
-import requests
-from requests import Response
+import aiohttp
 
+from .breaker import CircuitBreaker
+from .cache import StatusCache
 from .const import (
+    AUTH_REFRESH_MARGIN_SECONDS,
     AWPR_EFFECTS,
     AWPR_PRODUCT_MODELS,
+    BACKEND_CONCURRENCY_LIMITS,
     COLOR_PRESETS,
     DEFAULT_APPID,
     MODEL_ADVANCED,
+    RATE_LIMITS,
     SERIES_AWPR,
 )
+from .latency import LatencyTracker, mark_on_wire
+from .model import DeviceRecord
+from .ratelimit import RateLimiter, TokenBucket
+from .scheduler import RequestScheduler
+from .singleflight import SingleFlight
 
 _LOGGER = logging.getLogger(__name__)
 API_BASE = "https://api.gizwits.com/app"
 REQUEST_TIMEOUT = 15
-TRANSIENT_RETRY_DELAY = 1
-STATUS_FAILURE_BACKOFF_BASE = 30
-STATUS_FAILURE_BACKOFF_MAX = 300
 TRANSIENT_EXCEPTIONS = (
-    requests.exceptions.ConnectTimeout,
-    requests.exceptions.ConnectionError,
-    requests.exceptions.ReadTimeout,
-    requests.exceptions.SSLError,
+    aiohttp.ClientConnectionError,
+    asyncio.TimeoutError,
 )
 
 
@@ -35,19 +40,37 @@ class AwprBackend:
 
     series = SERIES_AWPR
 
-    def __init__(self, username: str, password: str, appid: str = DEFAULT_APPID) -> None:
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        username: str,
+        password: str,
+        appid: str = DEFAULT_APPID,
+        scheduler: RequestScheduler | None = None,
+        breaker: CircuitBreaker | None = None,
+        status_cache: StatusCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        self.session = session
+        self.scheduler = scheduler or RequestScheduler(self.series, BACKEND_CONCURRENCY_LIMITS["awpr"])
+        self.latency = LatencyTracker(REQUEST_TIMEOUT)
+        self.breaker = breaker or CircuitBreaker(self.series)
+        self.status_cache = status_cache or StatusCache(self.series)
+        self.rate_limiter = rate_limiter or RateLimiter(TokenBucket(self.series, **RATE_LIMITS["awpr"]))
         self.username = username
         self.password = password
         self.appid = appid
         self.token: str | None = None
         self.uid: str | None = None
         self.token_expiry: int = 0
-        self.session = requests.Session()
-        self._status_cache: dict[str, dict[str, Any]] = {}
-        self._status_backoff_until: dict[str, float] = {}
-        self._status_failures: dict[str, int] = {}
+        # Concurrent callers that find the session expired share one login.
+        self._logins = SingleFlight()
+
+    async def async_login(self) -> None:
+        """Log in, joining a login that is already in progress."""
+        await self._logins.run("login", self._login)
 
-    def login(self) -> None:
+    async def _login(self) -> None:
         url = f"{API_BASE}/login"
         headers = {
             "Content-Type": "application/json",
@@ -57,94 +80,109 @@ class AwprBackend:
         }
         payload = {"username": self.username, "password": self.password, "lang": "en"}
 
-        response = self.session.post(url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
-        if response.status_code != 200:
-            _LOGGER.error("AWPR login failed: %s - %s", response.status_code, response.text)
-            response.raise_for_status()
+        with self.breaker.attempt():
+            async with self.session.post(
+                url,
+                headers=headers,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response:
+                if response.status != 200:
+                    _LOGGER.error("AWPR login failed: %s - %s", response.status, await response.text())
+                    response.raise_for_status()
+                data = await response.json(content_type=None)
 
-        data = response.json()
         self.token = data.get("token")
         self.uid = data.get("uid")
         self.token_expiry = int(data.get("expire_at", time.time() + 3600))
 
-    def ensure_token(self) -> None:
+    async def async_ensure_token(self) -> None:
         if not self.token or time.time() > (self.token_expiry - 30):
-            self.login()
+            await self.async_login()
+
+    def token_refresh_at(self) -> float | None:
+        """Return when the background refresher should renew the token."""
+        return self.token_expiry - AUTH_REFRESH_MARGIN_SECONDS if self.token else None
+
+    def auth_state(self) -> dict[str, Any]:
+        """Return the session token so a restart can reuse it."""
+        if not self.token:
+            return {}
+        return {"token": self.token, "uid": self.uid, "expire_at": self.token_expiry}
 
-    def get_devices(self) -> list[dict[str, Any]]:
-        response = self._request("GET", "/bindings")
-        devices = response.json().get("devices", [])
-        results: list[dict[str, Any]] = []
+    def restore_auth(self, state: dict[str, Any]) -> None:
+        """Adopt a saved session token; expired ones are left for a fresh login."""
+        if state.get("token") and time.time() < int(state.get("expire_at", 0)) - 30:
+            self.token = state["token"]
+            self.uid = state.get("uid")
+            self.token_expiry = int(state["expire_at"])
 
-        for device in devices:
-            raw_id = str(device["did"])
-            attrs = self.get_status(raw_id)
+    async def async_get_devices(self) -> list[DeviceRecord]:
+        payload = await self._request("GET", "/bindings")
+        devices = payload.get("devices", [])
+        results: list[DeviceRecord] = []
+
+        raw_ids = [str(device["did"]) for device in devices]
+        self.status_cache.retain(raw_ids)
+        # Every bound device needs its status to derive capabilities, so the
+        # reads run as one parallel pass; the coordinator reuses these attrs
+        # as its first snapshot instead of fetching them again.
+        statuses = await asyncio.gather(*(self.async_get_status(raw_id) for raw_id in raw_ids))
+
+        for device, raw_id, attrs in zip(devices, raw_ids, statuses):
             product_key = device.get("product_key")
             model = AWPR_PRODUCT_MODELS.get(product_key, MODEL_ADVANCED)
             supports_rgb = "COLOR_SW" in attrs
 
             results.append(
-                {
-                    # Legacy AWPR payloads are normalized here so the rest of the
-                    # integration can stay backend-agnostic.
-                    "did": f"awpr:{raw_id}",
-                    "backend_id": raw_id,
-                    "series": self.series,
-                    "model": model,
-                    "name": device.get("product_name", "AFIRE Fireplace"),
-                    "mac": device.get("mac", "unknown"),
-                    "product_key": product_key,
-                    "ranges": self._ranges(attrs),
-                    "color_presets": COLOR_PRESETS if supports_rgb else {},
-                    "effect_commands": AWPR_EFFECTS if supports_rgb else {},
-                    "attrs": attrs,
-                    "refresh_delay": 0,
-                }
+                # Legacy AWPR payloads are normalized here so the rest of the
+                # integration can stay backend-agnostic.
+                DeviceRecord(
+                    did=f"awpr:{raw_id}",
+                    backend_id=raw_id,
+                    series=self.series,
+                    model=model,
+                    name=device.get("product_name", "AFIRE Fireplace"),
+                    mac=device.get("mac", "unknown"),
+                    product_key=product_key,
+                    # Gizwits advertises the websocket endpoint that pushes
+                    # status changes for this device.
+                    push_host=device.get("host"),
+                    push_port=device.get("wss_port"),
+                    ranges=self._ranges(attrs),
+                    color_presets=COLOR_PRESETS if supports_rgb else {},
+                    effect_commands=AWPR_EFFECTS if supports_rgb else {},
+                    attrs=attrs,
+                    refresh_delay=0,
+                )
             )
 
         return results
 
-    def get_status(self, raw_id: str) -> dict[str, Any]:
-        now = time.time()
-        if raw_id in self._status_cache and now < self._status_backoff_until.get(raw_id, 0):
-            return dict(self._status_cache[raw_id])
+    async def async_get_status(self, raw_id: str, fresh: bool = False) -> dict[str, Any]:
+        return await self.status_cache.async_get(
+            raw_id, lambda: self._read_status(raw_id), TRANSIENT_EXCEPTIONS, fresh
+        )
 
-        try:
-            response = self._request("GET", f"/devdata/{raw_id}/latest")
-        except TRANSIENT_EXCEPTIONS as exc:
-            cached = self._status_cache.get(raw_id)
-            if cached is None:
-                raise
-
-            failure_count = self._status_failures.get(raw_id, 0) + 1
-            self._status_failures[raw_id] = failure_count
-            backoff_seconds = min(
-                STATUS_FAILURE_BACKOFF_MAX,
-                STATUS_FAILURE_BACKOFF_BASE * (2 ** (failure_count - 1)),
-            )
-            self._status_backoff_until[raw_id] = time.time() + backoff_seconds
-            _LOGGER.warning(
-                "AWPR status fetch failed for %s, using cached state for %ss: %s",
-                raw_id,
-                backoff_seconds,
-                exc,
-            )
-            return dict(cached)
+    def remember_status(self, raw_id: str, attrs: dict[str, Any]) -> None:
+        """Record a pushed status so cache fallbacks start from it."""
+        self.status_cache.store(raw_id, attrs)
 
-        attrs = response.json().get("attr", {}) or {}
+    async def async_set_attr(self, device: dict[str, Any], attrs: dict[str, Any]) -> dict[str, Any]:
+        await self._request("POST", f"/control/{device['backend_id']}", json={"attrs": attrs}, json_request=True)
+        self.status_cache.invalidate(device["backend_id"])
+        return {"attrs": attrs, "refresh_delay": 0}
+
+    async def _read_status(self, raw_id: str) -> dict[str, Any]:
+        payload = await self.latency.hedged(
+            "devdata", lambda: self._request("GET", f"/devdata/{raw_id}/latest")
+        )
+        attrs = payload.get("attr", {}) or {}
         if not isinstance(attrs, dict):
             attrs = {}
-
-        self._status_cache[raw_id] = dict(attrs)
-        self._status_failures.pop(raw_id, None)
-        self._status_backoff_until.pop(raw_id, None)
         return attrs
 
-    def set_attr(self, device: dict[str, Any], attrs: dict[str, Any]) -> dict[str, Any]:
-        self._request("POST", f"/control/{device['backend_id']}", json={"attrs": attrs}, json_request=True)
-        return {"attrs": attrs, "refresh_delay": 0}
-
-    def _request(
+    async def _request(
         self,
         method: str,
         path: str,
@@ -153,30 +191,53 @@ class AwprBackend:
         json_request: bool = False,
         retry_auth: bool = True,
         retry_transient: bool = True,
-    ) -> Response:
-        self.ensure_token()
+    ) -> dict[str, Any]:
+        await self.async_ensure_token()
+        sent_token = self.token
         headers = {
             "Accept": "application/json",
             "X-Gizwits-Application-Id": self.appid,
-            "X-Gizwits-User-token": self.token,
+            "X-Gizwits-User-token": sent_token or "",
         }
         if json_request:
             headers["Content-Type"] = "application/json"
 
+        endpoint = path.split("/")[1]
+        timeout = self.latency.timeout(endpoint)
         try:
-            response = self.session.request(
-                method,
-                f"{API_BASE}{path}",
-                headers=headers,
-                json=json,
-                timeout=REQUEST_TIMEOUT,
-            )
+            with self.breaker.attempt():
+                await self.rate_limiter.acquire()
+                async with self.scheduler.slot():
+                    mark_on_wire()
+                    started = time.monotonic()
+                    async with self.session.request(
+                        method,
+                        f"{API_BASE}{path}",
+                        headers=headers,
+                        json=json,
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                    ) as response:
+                        self.latency.record(endpoint, time.monotonic() - started)
+                        if response.status not in (401, 403) or not retry_auth:
+                            if response.status != 200:
+                                _LOGGER.error(
+                                    "AWPR request failed for %s: %s - %s",
+                                    path,
+                                    response.status,
+                                    await response.text(),
+                                )
+                                response.raise_for_status()
+                            return await response.json(content_type=None)
         except TRANSIENT_EXCEPTIONS as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                # Count the timeout as a sample so a slowing endpoint widens
+                # its own budget instead of timing out at the old p99 forever.
+                self.latency.record(endpoint, timeout)
+            # The timeout already tracks this endpoint's latency, so the single
+            # retry goes out straight away instead of waiting a fixed delay.
             if retry_transient:
                 _LOGGER.warning("AWPR request %s failed transiently, retrying once: %s", path, exc)
-                self._reset_session()
-                time.sleep(TRANSIENT_RETRY_DELAY)
-                return self._request(
+                return await self._request(
                     method,
                     path,
                     json=json,
@@ -186,24 +247,18 @@ class AwprBackend:
                 )
             raise
 
-        if response.status_code in (401, 403) and retry_auth:
-            self.login()
-            return self._request(
-                method,
-                path,
-                json=json,
-                json_request=json_request,
-                retry_auth=False,
-                retry_transient=retry_transient,
-            )
-        if response.status_code != 200:
-            _LOGGER.error("AWPR request failed for %s: %s - %s", path, response.status_code, response.text)
-            response.raise_for_status()
-        return response
-
-    def _reset_session(self) -> None:
-        self.session.close()
-        self.session = requests.Session()
+        # Only an expired token falls through here: re-login once and replay,
+        # unless a concurrent request already replaced the token.
+        if self.token == sent_token:
+            await self.async_login()
+        return await self._request(
+            method,
+            path,
+            json=json,
+            json_request=json_request,
+            retry_auth=False,
+            retry_transient=retry_transient,
+        )
 
     @staticmethod
     def _ranges(attrs: dict[str, Any]) -> dict[str, dict[str, int]]:
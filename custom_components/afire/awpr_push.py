@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+import aiohttp
+
+from .awpr_api import AwprBackend
+from .const import (
+    AWPR_PUSH_HEARTBEAT_SECONDS,
+    AWPR_PUSH_RECONNECT_MAX_SECONDS,
+    AWPR_PUSH_RECONNECT_MIN_SECONDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+WS_PATH = "/ws/app/v1"
+
+
+class AwprPushClient:
+    """Gizwits websocket subscriber for one push endpoint."""
+
+    def __init__(
+        self,
+        backend: AwprBackend,
+        host: str,
+        port: int,
+        raw_ids: list[str],
+        on_status: Callable[[str, dict[str, Any]], None],
+        on_connection: Callable[[], None],
+        scheme: str = "wss",
+    ) -> None:
+        self._backend = backend
+        self.url = f"{scheme}://{host}:{port}{WS_PATH}"
+        self._raw_ids = list(raw_ids)
+        self._on_status = on_status
+        self._on_connection = on_connection
+        self._task: asyncio.Task | None = None
+        # Devices the server confirmed in subscribe_res; only these push.
+        self._subscribed: set[str] = set()
+        self.connected = False
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._async_run())
+
+    async def async_stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._set_connected(False)
+
+    def is_subscribed(self, raw_id: str) -> bool:
+        """Return True when status changes for the device arrive on this channel."""
+        return self.connected and raw_id in self._subscribed
+
+    async def _async_run(self) -> None:
+        delay = AWPR_PUSH_RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                await self._async_listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                _LOGGER.debug("AWPR push channel %s failed: %s", self.url, exc)
+            else:
+                delay = AWPR_PUSH_RECONNECT_MIN_SECONDS
+
+            # Polling covers the gap while the channel reconnects.
+            self._set_connected(False)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, AWPR_PUSH_RECONNECT_MAX_SECONDS)
+
+    async def _async_listen(self) -> None:
+        await self._backend.async_ensure_token()
+        async with self._backend.session.ws_connect(self.url) as ws:
+            await ws.send_json(
+                {
+                    "cmd": "login_req",
+                    "data": {
+                        "appid": self._backend.appid,
+                        "uid": self._backend.uid,
+                        "token": self._backend.token,
+                        "p0_type": "attrs_v4",
+                        "heartbeat_interval": AWPR_PUSH_HEARTBEAT_SECONDS * 2,
+                        "auto_subscribe": False,
+                    },
+                }
+            )
+            heartbeat = asyncio.create_task(self._async_heartbeat(ws))
+            try:
+                async for message in ws:
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    await self._async_handle_message(ws, message.json())
+            finally:
+                self._subscribed = set()
+                heartbeat.cancel()
+                # A ping that failed on the closing socket ends the task with
+                # an error; collect it so it is not reported as unretrieved.
+                await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def _async_heartbeat(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        while True:
+            await asyncio.sleep(AWPR_PUSH_HEARTBEAT_SECONDS)
+            await ws.send_json({"cmd": "ping"})
+
+    async def _async_handle_message(self, ws: aiohttp.ClientWebSocketResponse, message: dict[str, Any]) -> None:
+        command = message.get("cmd")
+        data = message.get("data") or {}
+
+        if command == "login_res":
+            if not data.get("success"):
+                raise RuntimeError("AWPR push login rejected")
+            await ws.send_json({"cmd": "subscribe_req", "data": [{"did": raw_id} for raw_id in self._raw_ids]})
+        elif command == "subscribe_res":
+            subscribed = [str(item.get("did")) for item in data.get("success", []) if isinstance(item, dict)]
+            failed = [str(item.get("did")) for item in data.get("failed", []) if isinstance(item, dict)]
+            if failed:
+                # These devices stay on regular polling.
+                _LOGGER.debug("AWPR push channel %s could not subscribe %s", self.url, failed)
+            self._subscribed = {raw_id for raw_id in subscribed if raw_id in self._raw_ids}
+            if self._subscribed:
+                self._set_connected(True)
+            # Read once after (re)subscribing so changes made while the channel
+            # was down are not missed.
+            for raw_id in subscribed:
+                await ws.send_json({"cmd": "c2s_read", "data": {"did": raw_id}})
+        elif command == "s2c_noti":
+            attrs = data.get("attrs")
+            if data.get("did") and isinstance(attrs, dict):
+                self._on_status(str(data["did"]), attrs)
+        elif command == "s2c_invalid_msg":
+            # Usually an expired token; reconnecting forces a fresh login.
+            self._backend.token = None
+            raise RuntimeError(f"AWPR push rejected message: {data.get('msg') or data.get('error_code')}")
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected != self.connected:
+            self.connected = connected
+            _LOGGER.debug("AWPR push channel %s %s", self.url, "connected" if connected else "disconnected")
+            self._on_connection()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import aiohttp
+
+from .const import (
+    BREAKER_COOLDOWN_MAX_SECONDS,
+    BREAKER_COOLDOWN_SECONDS,
+    BREAKER_FAILURE_THRESHOLD,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class BackendUnavailableError(Exception):
+    """Raised instead of sending a request while a backend's breaker is open."""
+
+
+class CircuitBreaker:
+    """Stops requests to a cloud host that keeps failing at the transport level.
+
+    After BREAKER_FAILURE_THRESHOLD consecutive connection errors, timeouts or
+    5xx responses the breaker opens and requests fail fast. Once the cooldown
+    elapses one request is let through as a probe; its outcome closes the
+    breaker or reopens it with a doubled cooldown.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.state = STATE_CLOSED
+        self._failures = 0
+        self._cooldown = BREAKER_COOLDOWN_SECONDS
+        self._open_until = 0.0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests are being refused."""
+        return self.state != STATE_CLOSED
+
+    @contextmanager
+    def attempt(self) -> Iterator[None]:
+        """Guard one request, refusing it or recording how it went."""
+        self._admit()
+        try:
+            yield
+        except asyncio.CancelledError:
+            if self.state == STATE_HALF_OPEN:
+                # The probe was abandoned without a verdict; the next request probes.
+                self.state = STATE_OPEN
+                self._open_until = 0.0
+            raise
+        except Exception as exc:
+            if self._is_failure(exc):
+                self._record_failure()
+            else:
+                self._record_success()
+            raise
+        else:
+            self._record_success()
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "cooldown": self._cooldown,
+            "retry_in": round(max(0.0, self._open_until - time.monotonic()), 1) if self.state == STATE_OPEN else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+    def _admit(self) -> None:
+        if self.state == STATE_CLOSED:
+            return
+        if self.state == STATE_OPEN and time.monotonic() >= self._open_until:
+            self.state = STATE_HALF_OPEN
+            _LOGGER.debug("AFIRE %s breaker half-open, sending probe", self.name)
+            return
+        self.rejected += 1
+        raise BackendUnavailableError(f"AFIRE {self.name} backend unavailable")
+
+    def _record_success(self) -> None:
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("AFIRE %s backend recovered", self.name)
+        self.state = STATE_CLOSED
+        self._failures = 0
+        self._cooldown = BREAKER_COOLDOWN_SECONDS
+
+    def _record_failure(self) -> None:
+        self._failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self._cooldown = min(BREAKER_COOLDOWN_MAX_SECONDS, self._cooldown * 2)
+        elif self.state == STATE_OPEN or self._failures < BREAKER_FAILURE_THRESHOLD:
+            return
+        self.state = STATE_OPEN
+        self.opened += 1
+        self._open_until = time.monotonic() + self._cooldown
+        _LOGGER.warning(
+            "AFIRE %s backend unreachable after %s failures, pausing requests for %ss",
+            self.name,
+            self._failures,
+            self._cooldown,
+        )
+
+    @staticmethod
+    def _is_failure(exc: Exception) -> bool:
+        # Only errors that say the host itself is unhealthy count; a 4xx or an
+        # application-level error code still proves the host is answering.
+        if isinstance(exc, aiohttp.ClientResponseError):
+            return exc.status >= 500
+        return isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, Mapping
+
+from .const import (
+    STATUS_CACHE_MAX_ENTRIES,
+    STATUS_CACHE_TTL_SECONDS,
+    STATUS_FAILURE_BACKOFF_BASE,
+    STATUS_FAILURE_BACKOFF_MAX,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _snapshot(attrs: Mapping[str, Any]) -> Mapping[str, Any]:
+    # Decoded AWPR2 states are immutable and shared as they are; plain dicts
+    # are copied so callers cannot change what the cache holds.
+    return dict(attrs) if isinstance(attrs, dict) else attrs
+
+
+@dataclass
+class _Entry:
+    attrs: Mapping[str, Any]
+    fetched_at: float = field(default_factory=time.monotonic)
+    failures: int = 0
+    retry_at: float = 0.0
+    # Cleared by invalidate(): a command made the entry unfit to serve
+    # in place of a read, even while the device is backing off.
+    current: bool = True
+
+
+class StatusCache:
+    """Last-known device status shared by a backend's read paths.
+
+    Entries younger than the TTL are served without a request. Healthy
+    devices are otherwise read inline, because the coordinator already paces
+    polls. Once a device fails transiently its stale entry is served right
+    away, and a single background refresh runs whenever its backoff expires.
+    A `fresh` read always asks the cloud and raises instead of serving stale.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = STATUS_CACHE_TTL_SECONDS,
+        max_entries: int = STATUS_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "revalidations": 0, "evictions": 0}
+
+    async def async_get(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Mapping[str, Any]]],
+        transient: tuple[type[BaseException], ...],
+        fresh: bool = False,
+    ) -> Mapping[str, Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.current and not fresh:
+            self._entries.move_to_end(key)
+            now = time.monotonic()
+            if now - entry.fetched_at < self.ttl:
+                self.stats["hits"] += 1
+                return _snapshot(entry.attrs)
+            if entry.failures:
+                if now >= entry.retry_at and key not in self._refreshing:
+                    self._revalidate(key, fetch)
+                self.stats["stale"] += 1
+                return _snapshot(entry.attrs)
+
+        self.stats["misses"] += 1
+        try:
+            attrs = await fetch()
+        except transient as exc:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise
+            backoff = self._record_failure(key)
+            if fresh:
+                raise
+            _LOGGER.warning(
+                "AFIRE %s status fetch failed for %s, using cached state for %ss: %s",
+                self.name,
+                key,
+                backoff,
+                exc,
+            )
+            self.stats["stale"] += 1
+            return _snapshot(entry.attrs)
+
+        self.store(key, attrs)
+        return _snapshot(attrs)
+
+    def store(self, key: str, attrs: Mapping[str, Any]) -> None:
+        """Record a fresh status and clear the device's backoff."""
+        self._entries[key] = _Entry(_snapshot(attrs))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._cancel_refresh(evicted)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, key: str) -> None:
+        """Force the next read of a device to hit the cloud."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.current = False
+        # A refresh already in flight may return the state from before.
+        self._cancel_refresh(key)
+
+    def retain(self, keys: Iterable[str]) -> None:
+        """Drop entries for devices that are no longer bound to the account."""
+        keep = set(keys)
+        for key in [key for key in self._entries if key not in keep]:
+            del self._entries[key]
+            self._cancel_refresh(key)
+            self.stats["evictions"] += 1
+
+    async def async_close(self) -> None:
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "backing_off": sum(1 for entry in self._entries.values() if entry.failures),
+            **self.stats,
+        }
+
+    def _revalidate(self, key: str, fetch: Callable[[], Awaitable[Mapping[str, Any]]]) -> None:
+        async def refresh() -> None:
+            try:
+                attrs = await fetch()
+            except Exception as exc:
+                if key in self._entries:
+                    _LOGGER.debug("AFIRE %s background refresh failed for %s: %s", self.name, key, exc)
+                    self._record_failure(key)
+                return
+            self.store(key, attrs)
+
+        self.stats["revalidations"] += 1
+        task = asyncio.ensure_future(refresh())
+        self._refreshing[key] = task
+        task.add_done_callback(lambda done: self._finish_refresh(key, done))
+
+    def _finish_refresh(self, key: str, task: asyncio.Task) -> None:
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+
+    def _record_failure(self, key: str) -> float:
+        entry = self._entries[key]
+        entry.failures += 1
+        backoff = min(STATUS_FAILURE_BACKOFF_MAX, STATUS_FAILURE_BACKOFF_BASE * (2 ** (entry.failures - 1)))
+        entry.retry_at = time.monotonic() + backoff
+        return backoff
+
+    def _cancel_refresh(self, key: str) -> None:
+        task = self._refreshing.pop(key, None)
+        if task is not None:
+            task.cancel()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from .const import COMMAND_COALESCE_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+Executor = Callable[[dict[str, Any], Callable[[str], bool]], Awaitable[dict[str, Any]]]
+
+
+class DeviceCommandActor:
+    """Owns the command stream of one device.
+
+    Writes are queued and drained by a single worker task, so two entities
+    writing the same fireplace can never interleave their key presses.
+    """
+
+    def __init__(self, did: str, execute: Executor, coalesce_seconds: float = COMMAND_COALESCE_SECONDS) -> None:
+        self.did = did
+        self._execute = execute
+        self._coalesce_seconds = coalesce_seconds
+        self._queue: deque[tuple[dict[str, Any], asyncio.Future]] = deque()
+        # Futures of the batch being executed; they are off the queue, so
+        # stopping has to resolve them from here.
+        self._inflight: list[asyncio.Future] = []
+        self._worker: asyncio.Task | None = None
+
+    async def async_submit(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        """Queue a write and wait until the worker has applied it."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((dict(attrs), future))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._async_run())
+        # Shielded so a caller giving up does not cancel a write that other
+        # callers were merged into.
+        return await asyncio.shield(future)
+
+    def superseded(self, key: str) -> bool:
+        """Return True when a queued write already carries a newer target for key."""
+        return any(key in attrs for attrs, _ in self._queue)
+
+    async def async_stop(self) -> None:
+        # Captured first: cancelling the worker clears its in-flight batch.
+        pending = [future for _, future in self._queue] + self._inflight
+        self._queue.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for future in pending:
+            if not future.done():
+                future.cancel()
+
+    async def _async_run(self) -> None:
+        while self._queue:
+            # Give rapid successive writes (a dragged slider) a moment to land
+            # so they are sent as one net target.
+            await asyncio.sleep(self._coalesce_seconds)
+            attrs: dict[str, Any] = {}
+            futures: list[asyncio.Future] = []
+            while self._queue:
+                queued_attrs, future = self._queue.popleft()
+                for key, value in queued_attrs.items():
+                    # Re-inserted so the merged order follows the latest
+                    # write; the AWPR2 planner lets later keys win between
+                    # colors and effects.
+                    attrs.pop(key, None)
+                    attrs[key] = value
+                futures.append(future)
+
+            self._inflight = futures
+            try:
+                result = await self._execute(attrs, self.superseded)
+            except Exception as exc:
+                _LOGGER.debug("AFIRE command for %s failed: %s", self.did, exc)
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for future in futures:
+                    if not future.done():
+                        future.set_result(result)
+            finally:
+                self._inflight = []
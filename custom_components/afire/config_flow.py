@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 
-import requests
+import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
 
 from .afire_api import AfireAPI
@@ -23,16 +25,15 @@ class CannotConnect(Exception):
 
 
 async def _validate_credentials(hass, username: str, password: str) -> list[dict]:
-    api = AfireAPI(username, password)
+    api = AfireAPI(username, password, session=async_get_clientsession(hass))
     try:
-        await hass.async_add_executor_job(api.login)
-        return await hass.async_add_executor_job(api.get_devices)
-    except requests.HTTPError as exc:
-        status = exc.response.status_code if exc.response is not None else None
-        if status in (400, 401, 403):
+        await api.async_login()
+        return await api.async_get_devices()
+    except aiohttp.ClientResponseError as exc:
+        if exc.status in (400, 401, 403):
             raise InvalidAuth from exc
         raise CannotConnect from exc
-    except requests.RequestException as exc:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
         raise CannotConnect from exc
     except Exception as exc:
         message = str(exc).lower()
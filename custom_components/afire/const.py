@@ -25,8 +25,110 @@ AWPR2_IOT_MODELS = {
 AWPR2_DEFAULT_MODEL = MODEL_PRESTIGE
 
 POLL_INTERVAL_SECONDS = 30
+# The coordinator ticks every POLL_TICK_SECONDS and only polls the devices that
+# are due. Fireplaces changed or commanded within POLL_ACTIVE_WINDOW_SECONDS
+# are polled fast, running ones every POLL_INTERVAL_SECONDS and ones that are
+# off slowly.
+POLL_TICK_SECONDS = 5
+POLL_ACTIVE_SECONDS = 10
+POLL_ACTIVE_WINDOW_SECONDS = 120
+POLL_IDLE_SECONDS = 120
+# Poll the AWPR2 fleet with one /products request instead of one /Online per device.
+AWPR2_BULK_POLL = True
+
+# AWPR devices can stream status changes over the Gizwits websocket. While the
+# push channel is up, polling drops to a slow safety net.
+AWPR_PUSH_ENABLED = True
+PUSH_SAFETY_POLL_INTERVAL_SECONDS = 300
+AWPR_PUSH_HEARTBEAT_SECONDS = 60
+AWPR_PUSH_RECONNECT_MIN_SECONDS = 5
+AWPR_PUSH_RECONNECT_MAX_SECONDS = 300
 AWPR2_REFRESH_DELAY_SECONDS = 3
+# After a command only that device is re-read until it reports the requested
+# state, doubling the wait between attempts.
+VERIFY_INITIAL_DELAY_SECONDS = 1
+VERIFY_MAX_ATTEMPTS = 4
+# Starting gap between pipelined AWPR2 level presses. Each device learns its
+# own gap within the min/max bounds: it shrinks after sequences that land
+# cleanly and doubles when presses are dropped.
 AWPR2_COMMAND_DELAY_SECONDS = 0.2
+AWPR2_COMMAND_DELAY_MIN_SECONDS = 0.05
+AWPR2_COMMAND_DELAY_MAX_SECONDS = 1.0
+# Verification reads that may find an AWPR2 level sequence not applied yet
+# before it is treated as lost rather than dropped.
+AWPR2_MAX_CORRECTION_ROUNDS = 2
+# Writes to one device within this window are merged into a single command.
+COMMAND_COALESCE_SECONDS = 0.3
+
+# Each backend keeps its own keep-alive connection pool. The size bounds how
+# many requests one backend can have open at once, so it should cover the
+# per-poll fan-out of a typical account.
+HTTP_POOL_SIZE = 10
+HTTP_KEEPALIVE_SECONDS = 60
+
+# Request timeouts follow observed latency per endpoint: a multiple of the
+# recent p99, bounded below by ADAPTIVE_TIMEOUT_MIN_SECONDS and above by each
+# backend's REQUEST_TIMEOUT. Idempotent status reads send a hedge request once
+# the first one is slower than the endpoint's p95.
+LATENCY_WINDOW = 50
+LATENCY_MIN_SAMPLES = 10
+ADAPTIVE_TIMEOUT_MULTIPLIER = 3
+ADAPTIVE_TIMEOUT_MIN_SECONDS = 3
+
+# A backend whose host fails this many requests in a row is paused: its
+# devices keep their last-known state and one probe request per cooldown
+# checks for recovery. The cooldown doubles after each failed probe.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 30
+BREAKER_COOLDOWN_MAX_SECONDS = 300
+
+# Upper bound on requests each backend has in flight at once. Both stay below
+# HTTP_POOL_SIZE so a push channel can hold its connection alongside them.
+BACKEND_CONCURRENCY_LIMITS = {
+    "awpr": 8,
+    "awpr2": 6,
+}
+
+# Token buckets in front of every backend request: one shared by the whole
+# account and one per cloud host. `burst` is the bucket size and `rate` the
+# sustained requests per second. Background polls never take the last
+# RATE_LIMIT_INTERACTIVE_RESERVE tokens, which are kept for user commands.
+RATE_LIMITS = {
+    "account": {"burst": 30, "rate": 5.0},
+    "awpr": {"burst": 20, "rate": 3.0},
+    "awpr2": {"burst": 20, "rate": 5.0},
+}
+RATE_LIMIT_INTERACTIVE_RESERVE = 3
+
+# Last-known status per device. Entries younger than the TTL are reused
+# without a request; devices that fail are served stale and retried in the
+# background after a per-device backoff. The TTL stays below the shortest
+# poll interval so scheduled polls always read the cloud.
+STATUS_CACHE_TTL_SECONDS = 5
+STATUS_CACHE_MAX_ENTRIES = 64
+STATUS_FAILURE_BACKOFF_BASE = 30
+STATUS_FAILURE_BACKOFF_MAX = 300
+
+# Credentials are renewed in the background before they expire: Gizwits
+# tokens AUTH_REFRESH_MARGIN_SECONDS ahead of `expire_at`, AWPR2 authcodes at
+# AUTH_REFRESH_FRACTION of the shortest lifetime observed before a 401.
+AUTH_REFRESH_MARGIN_SECONDS = 600
+AUTH_REFRESH_FRACTION = 0.8
+AUTH_REFRESH_IDLE_SECONDS = 300
+AUTH_REFRESH_RETRY_SECONDS = 60
+# Shorter-lived AWPR2 codes are taken as revoked (e.g. by a login elsewhere)
+# rather than expired, so they never shrink the learned lifetime.
+AWPR2_AUTH_MIN_LIFETIME_SECONDS = 3600
+
+# Normalized device records and backend tokens are saved per config entry so
+# a restart can create entities before the cloud answers; discovery confirms
+# them later and again every REDISCOVERY_INTERVAL_SECONDS.
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY_SECONDS = 30
+REDISCOVERY_INTERVAL_SECONDS = 3600
+# A backend family that has never returned devices for the account is left
+# out of login and discovery, and only asked again after this long.
+UNUSED_FAMILY_RECHECK_SECONDS = 86400
 
 NUMBER_SPECS = {
     "FLAME": {"label": "Flame Height", "min": 0, "max": 5, "step": 1, "icon": "mdi:fire"},
@@ -2,49 +2,95 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+import zlib
 from datetime import timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_call_later
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .afire_api import AfireAPI
-from .const import DOMAIN, POLL_INTERVAL_SECONDS
+from .scheduler import PRIORITY_INTERACTIVE, request_priority
+from .snapshot import AfireSnapshot
+from .const import (
+    AWPR_PUSH_ENABLED,
+    DOMAIN,
+    POLL_ACTIVE_SECONDS,
+    POLL_ACTIVE_WINDOW_SECONDS,
+    POLL_IDLE_SECONDS,
+    POLL_INTERVAL_SECONDS,
+    POLL_TICK_SECONDS,
+    PUSH_SAFETY_POLL_INTERVAL_SECONDS,
+    VERIFY_INITIAL_DELAY_SECONDS,
+    VERIFY_MAX_ATTEMPTS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class AfireCoordinator(DataUpdateCoordinator[dict[str, dict[str, Any]]]):
-    """Shared coordinator for AFIRE fireplaces."""
+class AfireCoordinator(DataUpdateCoordinator[AfireSnapshot]):
+    """Shared coordinator for AFIRE fireplaces.
+
+    `data` is an immutable AfireSnapshot; every publish produces a new
+    version, so entities can skip updates that do not touch their attrs.
+    """
 
     def __init__(self, hass: HomeAssistant, api: AfireAPI) -> None:
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=POLL_INTERVAL_SECONDS),
+            update_interval=timedelta(seconds=POLL_TICK_SECONDS),
         )
         self.api = api
+        # Per-device schedule: monotonic time of the next poll and of the last
+        # observed change or command.
+        self._next_poll: dict[str, float] = {}
+        self._last_activity: dict[str, float] = {}
+        # Attrs a command asked for that the device has not reported yet. They
+        # are overlaid on every status read so an early poll cannot flicker the
+        # UI back to the old value.
+        self._pending_intents: dict[str, dict[str, Any]] = {}
+        self._verify_tasks: dict[str, asyncio.Task] = {}
+        # Monotonic time of the last discovery run from the poll tick.
+        self._discovered_at = float("-inf")
 
-    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
+    async def _async_update_data(self) -> AfireSnapshot:
         try:
             if not self.api.devices:
-                # Discovery is cached after the first refresh; later updates only
-                # re-read device state for the known merged device list.
-                devices = await self.hass.async_add_executor_job(self.api.get_devices)
-            else:
-                devices = self.api.devices
-
-            async def fetch_status(did: str) -> dict[str, Any]:
-                return await self.hass.async_add_executor_job(self.api.get_status, did)
+                now = time.monotonic()
+                if self.data is not None and now - self._discovered_at < POLL_IDLE_SECONDS:
+                    # An account without devices is rediscovered at the idle
+                    # poll pace rather than on every tick.
+                    return self.data
+                self._discovered_at = now
+                # Discovery already reads every device's state (AWPR in one
+                # parallel pass, AWPR2 from /products), so the first snapshot is
+                # seeded from it instead of polling each device a second time.
+                # Later updates only re-read state for the cached device list.
+                devices = await self.api.async_get_devices()
+                self._stagger_polls(devices, time.monotonic())
+                return self._snapshot().evolve(devices, complete=True)
 
-            dids = [device["did"] for device in devices]
-            statuses = await asyncio.gather(*(fetch_status(did) for did in dids), return_exceptions=True)
+            devices = self.api.devices
+            now = time.monotonic()
+            due = {device["did"] for device in devices if self._next_poll.get(device["did"], 0) <= now}
+            if due & self.api.bulk_polled:
+                # One bulk request returns the whole AWPR2 fleet, so every
+                # device it covers is refreshed together.
+                due |= self.api.bulk_polled
+            # Status reads replace each device's attrs dict, so keep the old
+            # references to tell which devices actually changed.
+            previous = {device["did"]: device.get("attrs") for device in devices if device["did"] in due}
+            statuses = await self.api.async_get_statuses(sorted(due)) if due else {}
 
-            results: dict[str, dict[str, Any]] = {}
             failures: list[tuple[str, Exception]] = []
-            for device, attrs in zip(devices, statuses):
+            for device in devices:
+                if device["did"] not in due:
+                    continue
+
+                attrs = statuses[device["did"]]
                 if isinstance(attrs, Exception):
                     failures.append((device["did"], attrs))
                     cached_attrs = None
@@ -62,35 +108,156 @@ class AfireCoordinator(DataUpdateCoordinator[dict[str, dict[str, Any]]]):
                         attrs,
                     )
                     attrs = cached_attrs
+                else:
+                    if previous[device["did"]] is not None and attrs != previous[device["did"]]:
+                        self._last_activity[device["did"]] = now
+                    attrs = self._reconcile(device["did"], attrs)
 
                 device["attrs"] = attrs
-                results[device["did"]] = device
+                self._next_poll[device["did"]] = now + self._poll_interval(device, now)
 
             if failures:
                 _LOGGER.debug("AFIRE refresh completed with %s degraded device(s)", len(failures))
 
-            self.api.devices = list(results.values())
-            return results
+            # Only polled devices can have changed; the rest of the snapshot
+            # is shared with the previous version.
+            return self._snapshot().evolve(device for device in devices if device["did"] in due)
         except Exception as err:
             raise UpdateFailed(f"AFIRE update error: {err}") from err
 
+    @callback
+    def async_seed(self, devices: list[dict[str, Any]]) -> None:
+        """Start from a saved device catalog without waiting on the cloud."""
+        self.api.restore_devices(devices)
+        self._stagger_polls(devices, time.monotonic())
+        self.async_set_updated_data(self._snapshot().evolve(devices, complete=True))
+
+    async def async_rediscover(self) -> bool:
+        """Confirm the device list against the cloud.
+
+        Returns True when devices were added or removed since the last list.
+        """
+        known = set(self.data or {})
+        devices = await self.api.async_get_devices()
+        self._stagger_polls(devices, time.monotonic())
+        for device in devices:
+            device["attrs"] = self._reconcile(device["did"], device["attrs"])
+        self.async_set_updated_data(self._snapshot().evolve(devices, complete=True))
+        return {device["did"] for device in devices} != known
+
+    def _poll_interval(self, device: dict[str, Any], now: float) -> float:
+        did = device["did"]
+        if self.api.has_live_push(did):
+            return PUSH_SAFETY_POLL_INTERVAL_SECONDS
+        if now - self._last_activity.get(did, float("-inf")) < POLL_ACTIVE_WINDOW_SECONDS:
+            return POLL_ACTIVE_SECONDS
+        if not device.get("attrs", {}).get("POWERSW"):
+            return POLL_IDLE_SECONDS
+        return POLL_INTERVAL_SECONDS
+
+    def _stagger_polls(self, devices: list[dict[str, Any]], now: float) -> None:
+        # Each device gets a stable phase within its interval so polls are
+        # spread across ticks instead of all firing on the same one.
+        for device in devices:
+            phase = zlib.crc32(device["did"].encode()) / 0xFFFFFFFF
+            self._next_poll[device["did"]] = now + phase * self._poll_interval(device, now)
+
+    @callback
+    def async_start_push(self) -> None:
+        """Start streaming AWPR status pushes into the coordinator."""
+        if AWPR_PUSH_ENABLED:
+            self.api.start_push(self._async_handle_push, self._async_handle_push_connection)
+
+    @callback
+    def _async_handle_push(self, did: str, attrs: dict[str, Any]) -> None:
+        # Listeners are notified directly so a push does not postpone the
+        # next scheduled safety poll the way async_set_updated_data would.
+        self._publish(did, self._reconcile(did, attrs))
+
+    @callback
+    def _async_handle_push_connection(self, connected: bool) -> None:
+        # Pushed devices are only polled as a slow safety net, so when a
+        # channel drops their schedule is rebuilt on the regular intervals.
+        if not connected:
+            self._stagger_polls(self.api.devices, time.monotonic())
+
     async def async_set_device_attrs(self, did: str, attrs: dict[str, Any]) -> None:
-        """Apply device attrs and schedule a validation refresh if required."""
-        result = await self.hass.async_add_executor_job(self.api.set_attr, did, attrs)
+        """Apply device attrs and verify them with targeted re-reads."""
+        result = await self.api.async_set_attr(did, attrs)
+        self._last_activity[did] = time.monotonic()
+        intent = result.get("attrs", {})
 
-        if did in self.data:
+        device = self.api.get_device(did)
+        if device is not None and did in self.data:
             # AWPR2 commands can take a moment to settle in the cloud service, so
-            # entities get an optimistic state immediately and a delayed refresh
-            # later validates what the fireplace actually reported back.
-            self.data[did]["attrs"].update(result.get("attrs", {}))
-            self.async_set_updated_data(dict(self.data))
+            # entities get an optimistic state immediately and the intent keeps
+            # it in place until the fireplace reports the same values back.
+            if intent:
+                self._pending_intents[did] = {**self._pending_intents.get(did, {}), **intent}
+            device["attrs"] = {**device["attrs"], **intent}
+            self.async_set_updated_data(self.data.evolve([device]))
 
         refresh_delay = float(result.get("refresh_delay", 0) or 0)
-        if refresh_delay > 0:
-            async_call_later(
-                self.hass,
-                refresh_delay,
-                lambda _: self.hass.async_create_task(self.async_request_refresh()),
-            )
-        else:
-            await self.async_request_refresh()
+        previous = self._verify_tasks.pop(did, None)
+        if previous is not None:
+            previous.cancel()
+        self._verify_tasks[did] = self.hass.async_create_task(
+            self._async_verify_device(did, refresh_delay or VERIFY_INITIAL_DELAY_SECONDS)
+        )
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending verifications before the coordinator goes away."""
+        for task in self._verify_tasks.values():
+            task.cancel()
+        self._verify_tasks.clear()
+        await super().async_shutdown()
+
+    async def _async_verify_device(self, did: str, delay: float) -> None:
+        # Only the commanded device is re-read, with growing waits, until it
+        # reports what was asked for; the rest of the account is untouched.
+        reported: dict[str, Any] | None = None
+        try:
+            for _ in range(VERIFY_MAX_ATTEMPTS):
+                await asyncio.sleep(delay)
+                delay *= 2
+                try:
+                    # Confirming a user's command is interactive work and is
+                    # admitted ahead of background polls.
+                    with request_priority(PRIORITY_INTERACTIVE):
+                        reported = await self.api.async_verify_status(did)
+                except Exception as exc:
+                    _LOGGER.debug("AFIRE verification read failed for %s: %s", did, exc)
+                    continue
+
+                self._publish(did, self._reconcile(did, reported))
+                if did not in self._pending_intents:
+                    return
+
+            intent = self._pending_intents.pop(did, None)
+            if intent and reported is not None:
+                _LOGGER.debug("AFIRE %s never reported %s, showing the reported state", did, intent)
+                self._publish(did, reported)
+        finally:
+            if self._verify_tasks.get(did) is asyncio.current_task():
+                del self._verify_tasks[did]
+
+    def _reconcile(self, did: str, attrs: dict[str, Any]) -> dict[str, Any]:
+        intent = self._pending_intents.get(did)
+        if not intent:
+            return attrs
+        if all(attrs.get(key) == value for key, value in intent.items()):
+            del self._pending_intents[did]
+            return attrs
+        return {**attrs, **intent}
+
+    @callback
+    def _publish(self, did: str, attrs: dict[str, Any]) -> None:
+        device = self.api.get_device(did)
+        if device is None or not self.data or did not in self.data:
+            return
+        device["attrs"] = attrs
+        self.data = self.data.evolve([device])
+        self.async_update_listeners()
+
+    def _snapshot(self) -> AfireSnapshot:
+        return self.data if self.data is not None else AfireSnapshot()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import AfireCoordinator
+
+
+class AfireEntity(CoordinatorEntity[AfireCoordinator]):
+    """Coordinator entity that only writes state when its own attrs change.
+
+    Each entity names the attrs it renders; a coordinator publish that did
+    not touch them (another device, or another attr of the same device)
+    skips the state write entirely.
+    """
+
+    def __init__(self, coordinator: AfireCoordinator, did: str, watched: Iterable[str]) -> None:
+        super().__init__(coordinator)
+        self.did = did
+        self._watched = frozenset(watched)
+        self._seen_version = coordinator.data.version if coordinator.data is not None else 0
+        self._seen_available: bool | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        snapshot = self.coordinator.data
+        available = self.available
+        if (
+            available == self._seen_available
+            and snapshot is not None
+            and not snapshot.changed_since(self._seen_version, self.did, self._watched)
+        ):
+            return
+        self._seen_available = available
+        if snapshot is not None:
+            self._seen_version = snapshot.version
+        super()._handle_coordinator_update()
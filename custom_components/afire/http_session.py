@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from .const import HTTP_KEEPALIVE_SECONDS, HTTP_POOL_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """Connection counters for one pooled session."""
+
+    requests: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class PooledSession:
+    """Long-lived keep-alive aiohttp session owned by a single backend."""
+
+    def __init__(
+        self,
+        name: str,
+        pool_size: int = HTTP_POOL_SIZE,
+        keepalive_timeout: float = HTTP_KEEPALIVE_SECONDS,
+    ) -> None:
+        self.name = name
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.stats = PoolStats()
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            # Connections to the cloud host are kept open between polls and
+            # key presses, so only the first request pays for TCP and TLS.
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_start.append(self._on_request_start)
+            trace_config.on_connection_create_end.append(self._on_connection_create_end)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+        return self._session
+
+    async def async_close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def diagnostics(self) -> dict[str, Any]:
+        stats = self.stats.as_dict()
+        stats["pool_size"] = self.pool_size
+        return stats
+
+    async def _on_request_start(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceRequestStartParams,
+    ) -> None:
+        self.stats.requests += 1
+
+    async def _on_connection_create_end(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceConnectionCreateEndParams,
+    ) -> None:
+        self.stats.new_connections += 1
+        _LOGGER.debug("AFIRE %s pool opened a new connection", self.name)
+
+    async def _on_connection_reuseconn(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceConnectionReuseconnParams,
+    ) -> None:
+        self.stats.reused_connections += 1
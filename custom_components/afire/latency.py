@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, TypeVar
+
+from .const import (
+    ADAPTIVE_TIMEOUT_MIN_SECONDS,
+    ADAPTIVE_TIMEOUT_MULTIPLIER,
+    LATENCY_MIN_SAMPLES,
+    LATENCY_WINDOW,
+)
+
+_T = TypeVar("_T")
+
+# Set while a hedged request's first copy is created, so the backend can say
+# when that copy leaves the rate limiter and scheduler queue.
+_ON_WIRE: ContextVar[asyncio.Event | None] = ContextVar("afire_on_wire", default=None)
+
+
+def mark_on_wire() -> None:
+    """Record that the current request holds its slot and is being sent."""
+    event = _ON_WIRE.get()
+    if event is not None:
+        event.set()
+
+
+class LatencyTracker:
+    """Rolling per-endpoint latency used for timeouts and request hedging."""
+
+    def __init__(self, max_timeout: float) -> None:
+        self.max_timeout = max_timeout
+        self._samples: dict[str, deque[float]] = {}
+        self._hedges = {"sent": 0, "won": 0}
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self._samples.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def percentile(self, endpoint: str, fraction: float) -> float | None:
+        samples = self._samples.get(endpoint)
+        if not samples or len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def timeout(self, endpoint: str) -> float:
+        p99 = self.percentile(endpoint, 0.99)
+        if p99 is None:
+            return self.max_timeout
+        return max(ADAPTIVE_TIMEOUT_MIN_SECONDS, min(self.max_timeout, p99 * ADAPTIVE_TIMEOUT_MULTIPLIER))
+
+    async def hedged(self, endpoint: str, request: Callable[[], Awaitable[_T]]) -> _T:
+        """Run an idempotent request, racing a second copy once it passes p95.
+
+        The p95 is measured on the wire, so the hedge timer only starts once
+        the first copy has left the queue; a copy sent for a request that is
+        merely waiting for a slot would only add to the backlog.
+        """
+        delay = self.percentile(endpoint, 0.95)
+        on_wire = asyncio.Event()
+        token = _ON_WIRE.set(on_wire)
+        try:
+            first = asyncio.ensure_future(request())
+        finally:
+            _ON_WIRE.reset(token)
+        if delay is None:
+            return await first
+
+        tasks = {first}
+        sent = asyncio.ensure_future(on_wire.wait())
+        try:
+            await asyncio.wait({first, sent}, return_when=asyncio.FIRST_COMPLETED)
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self._hedges["sent"] += 1
+                tasks.add(asyncio.ensure_future(request()))
+
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self._hedges["won"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            sent.cancel()
+            for task in tasks:
+                task.cancel()
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "endpoints": {
+                endpoint: {
+                    "samples": len(samples),
+                    "p50": self.percentile(endpoint, 0.5),
+                    "p95": self.percentile(endpoint, 0.95),
+                    "timeout": self.timeout(endpoint),
+                }
+                for endpoint, samples in self._samples.items()
+            },
+            "hedges": dict(self._hedges),
+        }
@@ -4,10 +4,10 @@ import logging
 
 from homeassistant.components.light import ColorMode, LightEntity, LightEntityFeature
 from homeassistant.core import callback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import COLOR_PRESETS, DOMAIN
 from .coordinator import AfireCoordinator
+from .entity import AfireEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,15 +24,17 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(entities)
 
 
-class AfireColorLight(CoordinatorEntity, LightEntity):
+class AfireColorLight(AfireEntity, LightEntity):
     _attr_supported_color_modes = {ColorMode.RGB}
     _attr_supported_features = LightEntityFeature.EFFECT
     _attr_icon = "mdi:lightbulb-multiple"
     _attr_color_mode = ColorMode.RGB
 
     def __init__(self, coordinator: AfireCoordinator, did: str, dev: dict):
-        super().__init__(coordinator)
-        self.did = did
+        effect_commands = dict(dev.get("effect_commands", {}))
+        color_presets = dict(dev.get("color_presets", COLOR_PRESETS))
+        watched = {"COLOR_SW", *effect_commands.values(), *(command for command, _ in color_presets.values())}
+        super().__init__(coordinator, did, watched)
         self.dev = dev
 
         base_name = dev.get("name", "Fireplace")
@@ -41,8 +43,8 @@ class AfireColorLight(CoordinatorEntity, LightEntity):
         self._attr_name = f"{base_name} Colors"
         self._attr_unique_id = f"{did.replace(':', '_')}_color"
 
-        self._effect_commands = dict(dev.get("effect_commands", {}))
-        self._color_presets = dict(dev.get("color_presets", COLOR_PRESETS))
+        self._effect_commands = effect_commands
+        self._color_presets = color_presets
         self._attr_effect_list = list(self._effect_commands.keys())
         self._current_effect: str | None = None
         self._current_color: tuple[int, int, int] | None = None
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, MutableMapping
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Any, Iterator
+
+from .const import AWPR2_COLOR_COMMANDS, AWPR2_COLOR_STATE_MAP
+
+# Bit positions follow the first four `open_state` characters.
+_AWPR2_FLAG_BITS = {"POWERSW": 0, "LED_SW": 1, "COLOR_SW": 2, "RGB_PLAY": 3}
+_AWPR2_LEVELS = ("FLAME", "SPEED", "BRIGHTNESS")
+_AWPR2_LEVEL_INDEX = {key: index for index, key in enumerate(_AWPR2_LEVELS)}
+_AWPR2_COLORS = tuple(AWPR2_COLOR_COMMANDS)
+_AWPR2_COLOR_INDEX = {state: _AWPR2_COLORS.index(key) for state, key in AWPR2_COLOR_STATE_MAP.items()}
+# Key order matches the dict the AWPR2 parser used to build.
+_AWPR2_KEYS = ("POWERSW", "LED_SW", *_AWPR2_LEVELS)
+_AWPR2_RGB_KEYS = (*_AWPR2_KEYS, "COLOR_SW", "RGB_PLAY", *_AWPR2_COLORS)
+_AWPR2_STATE_CACHE_SIZE = 256
+
+
+class Awpr2State(Mapping[str, Any]):
+    """Immutable AWPR2 state decoded from one `open_state` string.
+
+    The switches live in one bitfield and the levels in small ints. The
+    mapping view exposes the same keys and 0/1 values as the former dict, so
+    entities and the planner read it unchanged.
+    """
+
+    __slots__ = ("_flags", "_levels", "_color", "_rgb")
+
+    def __init__(self, flags: int, levels: tuple[int, int, int], color: int, rgb: bool) -> None:
+        self._flags = flags
+        self._levels = levels
+        self._color = color
+        self._rgb = rgb
+
+    def __getitem__(self, key: str) -> int:
+        index = _AWPR2_LEVEL_INDEX.get(key)
+        if index is not None:
+            return self._levels[index]
+        bit = _AWPR2_FLAG_BITS.get(key)
+        if bit is not None and (bit < 2 or self._rgb):
+            return (self._flags >> bit) & 1
+        if self._rgb and key in AWPR2_COLOR_COMMANDS:
+            return 1 if self._color >= 0 and _AWPR2_COLORS[self._color] == key else 0
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_AWPR2_RGB_KEYS if self._rgb else _AWPR2_KEYS)
+
+    def __len__(self) -> int:
+        return len(_AWPR2_RGB_KEYS if self._rgb else _AWPR2_KEYS)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Awpr2State):
+            return (self._flags, self._levels, self._color, self._rgb) == (
+                other._flags,
+                other._levels,
+                other._color,
+                other._rgb,
+            )
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Awpr2State({dict(self)!r})"
+
+
+def decode_awpr2_state(open_state: str, rgb: bool) -> Awpr2State:
+    """Decode an AWPR2 `open_state`, sharing one instance per distinct string."""
+    return _decode_awpr2_state((open_state or "").strip(), rgb)
+
+
+@lru_cache(maxsize=_AWPR2_STATE_CACHE_SIZE)
+def _decode_awpr2_state(chars: str, rgb: bool) -> Awpr2State:
+    # The API returns an 8-character ASCII state string. Bytes 5-7 are the
+    # characters '1'..'8' (documented as 0x31..0x38), so they are parsed as
+    # decimal digits after extracting each character.
+    if len(chars) < 8:
+        chars = chars.ljust(8, "0")
+    flags = 0
+    for bit, char in enumerate(chars[:4]):
+        if char == "1":
+            flags |= 1 << bit
+    levels = (_decode_level(chars[4]), _decode_level(chars[5]), _decode_level(chars[6]))
+    color = _AWPR2_COLOR_INDEX.get(chars[7].upper(), -1)
+    return Awpr2State(flags, levels, color, rgb)
+
+
+def _decode_level(value: str, default: int = 1) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(slots=True)
+class DeviceRecord(MutableMapping[str, Any]):
+    """Normalized fireplace shared by the API facade, coordinator and entities.
+
+    Fields are fixed per record, so it is stored in slots; the mapping view
+    keeps the dict-style access the rest of the integration was written
+    against. Setting a key that is not a field raises KeyError.
+    """
+
+    did: str
+    backend_id: str
+    series: str
+    model: str
+    name: str = "AFIRE Fireplace"
+    mac: str = "unknown"
+    ranges: dict[str, dict[str, int]] = field(default_factory=dict)
+    color_presets: dict[str, Any] = field(default_factory=dict)
+    effect_commands: dict[str, Any] = field(default_factory=dict)
+    attrs: Mapping[str, Any] = field(default_factory=dict)
+    refresh_delay: float = 0
+    product_key: str | None = None
+    push_host: str | None = None
+    push_port: int | None = None
+    iot_id: str | None = None
+    state: Any = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> DeviceRecord:
+        """Rebuild a record saved with `as_dict`, ignoring unknown keys."""
+        return cls(**{_ATTRIBUTES[key]: value for key, value in data.items() if key in _ATTRIBUTES})
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a plain, JSON-serializable copy for storage."""
+        data = dict(self)
+        data["attrs"] = dict(self.attrs)
+        return data
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _ATTRIBUTES:
+            raise KeyError(key)
+        return getattr(self, _ATTRIBUTES[key])
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _ATTRIBUTES:
+            raise KeyError(key)
+        setattr(self, _ATTRIBUTES[key], value)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("DeviceRecord fields cannot be deleted")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return len(_KEYS)
+
+
+# Mapping keys keep the names of the former dict records, including the
+# camel-cased `iotId` taken from the AWPR2 API.
+_ATTRIBUTES = {("iotId" if item.name == "iot_id" else item.name): item.name for item in fields(DeviceRecord)}
+_KEYS = tuple(_ATTRIBUTES)
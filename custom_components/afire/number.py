@@ -3,10 +3,10 @@ from __future__ import annotations
 import logging
 
 from homeassistant.components.number import NumberEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, NUMBER_SPECS
 from .coordinator import AfireCoordinator
+from .entity import AfireEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,7 +38,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(entities)
 
 
-class AfireNumber(CoordinatorEntity, NumberEntity):
+class AfireNumber(AfireEntity, NumberEntity):
     def __init__(
         self,
         coordinator: AfireCoordinator,
@@ -51,8 +51,7 @@ class AfireNumber(CoordinatorEntity, NumberEntity):
         step: int,
         icon: str,
     ):
-        super().__init__(coordinator)
-        self.did = did
+        super().__init__(coordinator, did, {key})
         self.dev = dev
         self._key = key
 
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from .const import RATE_LIMIT_INTERACTIVE_RESERVE
+from .scheduler import PRIORITY_BACKGROUND, PRIORITY_NAMES, QueueWaitStats, current_priority
+
+
+class TokenBucket:
+    """Sustained request rate with a bounded burst."""
+
+    def __init__(self, name: str, burst: float, rate: float) -> None:
+        self.name = name
+        self.burst = burst
+        self.rate = rate
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def wait_time(self, needed: float) -> float:
+        """Return how long until `needed` tokens are available."""
+        self._refill()
+        if self._tokens >= needed:
+            return 0.0
+        return (needed - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+    def diagnostics(self) -> dict[str, Any]:
+        self._refill()
+        return {"burst": self.burst, "rate": self.rate, "tokens": round(self._tokens, 2)}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:
+    """Takes one token from every bucket a backend request is subject to.
+
+    Background polls leave RATE_LIMIT_INTERACTIVE_RESERVE tokens untouched,
+    so when the buckets run low user commands still go out first.
+    """
+
+    def __init__(self, *buckets: TokenBucket) -> None:
+        self.buckets = buckets
+        self.stats = {priority: QueueWaitStats() for priority in PRIORITY_NAMES}
+
+    async def acquire(self) -> None:
+        priority = current_priority()
+        needed = 1 + (RATE_LIMIT_INTERACTIVE_RESERVE if priority == PRIORITY_BACKGROUND else 0)
+        started = time.monotonic()
+        throttled = False
+        while True:
+            wait = max(bucket.wait_time(needed) for bucket in self.buckets)
+            if wait <= 0:
+                break
+            throttled = True
+            await asyncio.sleep(wait)
+        for bucket in self.buckets:
+            bucket.take()
+        self.stats[priority].record(time.monotonic() - started if throttled else 0.0)
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "buckets": {bucket.name: bucket.diagnostics() for bucket in self.buckets},
+            "throttled": {PRIORITY_NAMES[priority]: stats.as_dict() for priority, stats in self.stats.items()},
+        }
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Backends read the class of the request they are about to send from the
+# calling task's context, so callers do not thread it through every method.
+_REQUEST_PRIORITY: ContextVar[int] = ContextVar("afire_request_priority", default=PRIORITY_BACKGROUND)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run the enclosed backend requests (and tasks created there) at priority."""
+    token = _REQUEST_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _REQUEST_PRIORITY.reset(token)
+
+
+def current_priority() -> int:
+    """Return the priority class of requests sent from the current task."""
+    return _REQUEST_PRIORITY.get()
+
+
+@dataclass
+class QueueWaitStats:
+    """Queue-wait counters for one priority class."""
+
+    requests: int = 0
+    queued: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record(self, wait: float) -> None:
+        self.requests += 1
+        if wait > 0:
+            self.queued += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "queued": self.queued,
+            "avg_wait": round(self.total_wait / self.requests, 4) if self.requests else 0.0,
+            "max_wait": round(self.max_wait, 4),
+        }
+
+
+class RequestScheduler:
+    """Admits backend requests into a fixed number of slots by priority.
+
+    When every slot is busy, interactive commands and targeted verification
+    reads are admitted before queued background polls and rediscovery.
+    """
+
+    def __init__(self, name: str, slots: int) -> None:
+        self.name = name
+        self.slots = slots
+        self._in_use = 0
+        self._counter = itertools.count()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self.stats = {priority: QueueWaitStats() for priority in PRIORITY_NAMES}
+        self.peak_in_use = 0
+        self.saturated = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self._acquire(current_priority())
+        try:
+            yield
+        finally:
+            self._release()
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "in_use": self._in_use,
+            "peak_in_use": self.peak_in_use,
+            "occupancy": round(self._in_use / self.slots, 2) if self.slots else 0.0,
+            "saturated": self.saturated,
+            "waiting": len(self._waiters),
+            "queue_wait": {PRIORITY_NAMES[priority]: stats.as_dict() for priority, stats in self.stats.items()},
+        }
+
+    async def _acquire(self, priority: int) -> None:
+        if self._in_use < self.slots and not self._waiters:
+            self._take_slot()
+            self.stats[priority].record(0.0)
+            return
+
+        # Every slot is busy: count it so sustained saturation is visible.
+        self.saturated += 1
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._counter), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            elif not future.cancelled():
+                # The slot was handed over just as the caller gave up.
+                self._release()
+            raise
+        self.stats[priority].record(time.monotonic() - started)
+
+    def _release(self) -> None:
+        self._in_use -= 1
+        while self._waiters and self._in_use < self.slots:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._take_slot()
+                future.set_result(None)
+
+    def _take_slot(self) -> None:
+        self._in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self._in_use)
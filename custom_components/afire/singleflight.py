@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Hashable
+from typing import Any, Awaitable, Callable, TypeVar
+
+_T = TypeVar("_T")
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers await the same one.
+
+    Used for backend logins and per-device status reads, where a burst of
+    callers should cost a single request.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.stats = {"requests": 0, "deduplicated": 0}
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[_T]]) -> _T:
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["requests"] += 1
+            task = self._inflight[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.stats["deduplicated"] += 1
+        # Shielded so one caller giving up does not cancel the call for the
+        # others sharing it.
+        return await asyncio.shield(task)
+
+    def diagnostics(self) -> dict[str, Any]:
+        return dict(self.stats)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the failure as retrieved even when every caller gave up.
+            task.exception()
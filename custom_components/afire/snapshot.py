@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import replace
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator
+
+from .model import DeviceRecord
+
+
+def _freeze(attrs: Mapping[str, Any]) -> Mapping[str, Any]:
+    # Decoded AWPR2 states are already immutable; plain dicts are copied
+    # behind a read-only proxy.
+    return MappingProxyType(dict(attrs)) if isinstance(attrs, dict) else attrs
+
+
+class AfireSnapshot(Mapping[str, DeviceRecord]):
+    """Immutable, versioned view of every device the coordinator publishes.
+
+    Each publish builds a new snapshot that shares the records of unchanged
+    devices with its predecessor and holds frozen copies of changed ones.
+    Every attr remembers the version it last changed in, so an entity can
+    ask whether anything it renders changed since the version it wrote.
+    """
+
+    __slots__ = ("version", "changes", "_devices", "_versions")
+
+    def __init__(
+        self,
+        version: int = 0,
+        devices: dict[str, DeviceRecord] | None = None,
+        versions: dict[str, tuple[int, Mapping[str, int]]] | None = None,
+        changes: dict[str, frozenset[str]] | None = None,
+    ) -> None:
+        self.version = version
+        # Attrs changed per device by the publish that produced this version.
+        self.changes: Mapping[str, frozenset[str]] = MappingProxyType(changes or {})
+        self._devices = devices or {}
+        # did -> (version the record itself last changed, attr -> version).
+        self._versions = versions or {}
+
+    def __getitem__(self, did: str) -> DeviceRecord:
+        return self._devices[did]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._devices)
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def changed_since(self, version: int, did: str, keys: Iterable[str]) -> bool:
+        """Return True if the device or any of `keys` changed after `version`."""
+        versions = self._versions.get(did)
+        if versions is None:
+            return False
+        record_version, key_versions = versions
+        return record_version > version or any(key_versions.get(key, 0) > version for key in keys)
+
+    def evolve(self, records: Iterable[DeviceRecord], *, complete: bool = False) -> AfireSnapshot:
+        """Return the next snapshot with `records` applied.
+
+        With `complete` the records are the whole device list and devices
+        missing from it are dropped; otherwise other devices carry over.
+        """
+        version = self.version + 1
+        devices = {} if complete else dict(self._devices)
+        versions = {} if complete else dict(self._versions)
+        changes: dict[str, frozenset[str]] = {}
+
+        for record in records:
+            did = record.did
+            previous = self._devices.get(did)
+            if previous is not None and previous == record:
+                devices[did] = previous
+                versions[did] = self._versions[did]
+                continue
+
+            frozen = replace(record, attrs=_freeze(record.attrs))
+            devices[did] = frozen
+            if previous is None or any(previous[key] != record[key] for key in record if key != "attrs"):
+                # New or rediscovered with different metadata: everything counts.
+                versions[did] = (version, {})
+                changes[did] = frozenset(frozen.attrs)
+                continue
+
+            changed = frozenset(
+                key
+                for key in {*previous.attrs, *frozen.attrs}
+                if previous.attrs.get(key) != frozen.attrs.get(key)
+            )
+            record_version, key_versions = self._versions[did]
+            versions[did] = (record_version, {**key_versions, **dict.fromkeys(changed, version)})
+            changes[did] = changed
+
+        return AfireSnapshot(version, devices, versions, changes)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY_SECONDS, STORAGE_VERSION
+
+
+def _store(hass: HomeAssistant, entry_id: str) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+
+async def async_remove_storage(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete everything persisted for a removed config entry."""
+    await _store(hass, entry_id).async_remove()
+
+
+class AfireStorage:
+    """Per-entry state kept across restarts.
+
+    Holds the device catalog, the backend session tokens and the backend
+    families the account uses. The file lives in Home Assistant's private
+    `.storage` directory next to the config entry and is never included in
+    diagnostics.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, username: str) -> None:
+        self.username = username
+        self._store = _store(hass, entry_id)
+        self._data: dict[str, Any] = {}
+        self._state: Callable[[], dict[str, Any]] | None = None
+        self._save_scheduled = False
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        # Saved state belongs to one account; switching accounts in the
+        # options flow starts over from discovery.
+        self._data = data if data.get("username") == self.username else {}
+
+    @property
+    def state(self) -> dict[str, Any]:
+        """Return what the last run saved for this account."""
+        return {key: value for key, value in self._data.items() if key != "username"}
+
+    @callback
+    def async_schedule_save(self, state: Callable[[], dict[str, Any]]) -> None:
+        """Save the account state after a short delay.
+
+        Coordinator updates arrive every few seconds, so at most one write is
+        pending at a time and it captures the state as it is when it runs.
+        """
+        self._state = state
+        if not self._save_scheduled:
+            self._save_scheduled = True
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY_SECONDS)
+
+    async def async_save(self, state: Callable[[], dict[str, Any]]) -> None:
+        """Write the account state now."""
+        self._state = state
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._save_scheduled = False
+        if self._state is not None:
+            self._data = self._state()
+        self._data["username"] = self.username
+        return self._data
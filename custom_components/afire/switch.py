@@ -3,10 +3,10 @@ from __future__ import annotations
 import logging
 
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import AfireCoordinator
+from .entity import AfireEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,10 +30,9 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(entities)
 
 
-class AfireSwitch(CoordinatorEntity, SwitchEntity):
+class AfireSwitch(AfireEntity, SwitchEntity):
     def __init__(self, coordinator: AfireCoordinator, did: str, dev: dict, label: str, key: str, icon: str):
-        super().__init__(coordinator)
-        self.did = did
+        super().__init__(coordinator, did, {key})
         self.dev = dev
         self._key = key
 
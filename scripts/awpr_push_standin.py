@@ -0,0 +1,198 @@
+"""Local stand-in for the Gizwits websocket push channel.
+
+Serves the subset of the Gizwits app websocket protocol that
+`AwprPushClient` speaks (login, subscribe, read, notifications, pings) on
+localhost, so the push code can be exercised without the cloud. Only
+aiohttp is needed; Home Assistant is not.
+
+    python scripts/awpr_push_standin.py            # run the self-check
+    python scripts/awpr_push_standin.py --serve    # serve on 127.0.0.1:8080
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import types
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+# Load the integration modules without the package __init__, which needs
+# Home Assistant.
+_PACKAGE = Path(__file__).resolve().parents[1] / "custom_components" / "afire"
+_afire = types.ModuleType("afire")
+_afire.__path__ = [str(_PACKAGE)]
+sys.modules.setdefault("afire", _afire)
+
+from afire import awpr_push  # noqa: E402
+from afire.awpr_api import AwprBackend  # noqa: E402
+from afire.awpr_push import WS_PATH, AwprPushClient  # noqa: E402
+
+TOKEN = "standin-token"
+
+
+class GizwitsPushStandIn:
+    """In-process Gizwits websocket server holding per-device attrs."""
+
+    def __init__(self, devices: dict[str, dict[str, Any]], unsubscribable: set[str] | None = None) -> None:
+        self.devices = devices
+        # Devices answered under `failed` in subscribe_res.
+        self.unsubscribable = unsubscribable or set()
+        self.logins = 0
+        self.pings = 0
+        self._sockets: set[web.WebSocketResponse] = set()
+        self._subscriptions: dict[web.WebSocketResponse, set[str]] = {}
+        self._runner: web.AppRunner | None = None
+        self.port = 0
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        app = web.Application()
+        app.router.add_get(WS_PATH, self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def async_stop(self) -> None:
+        await self.async_drop()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def async_push(self, raw_id: str, attrs: dict[str, Any]) -> None:
+        """Change a device as if from its panel and notify subscribers."""
+        self.devices[raw_id].update(attrs)
+        for ws, subscribed in list(self._subscriptions.items()):
+            if raw_id in subscribed:
+                await self._notify(ws, raw_id)
+
+    async def async_drop(self) -> None:
+        """Close every connection, as a cloud-side disconnect would."""
+        for ws in list(self._sockets):
+            await ws.close()
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+        self._subscriptions[ws] = set()
+        try:
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    await self._handle_message(ws, message.json())
+        finally:
+            self._sockets.discard(ws)
+            self._subscriptions.pop(ws, None)
+        return ws
+
+    async def _handle_message(self, ws: web.WebSocketResponse, message: dict[str, Any]) -> None:
+        command = message.get("cmd")
+        data = message.get("data") or {}
+        if command == "login_req":
+            self.logins += 1
+            await ws.send_json({"cmd": "login_res", "data": {"success": data.get("token") == TOKEN}})
+        elif command == "subscribe_req":
+            requested = [str(item.get("did")) for item in data]
+            success = [did for did in requested if did in self.devices and did not in self.unsubscribable]
+            failed = [did for did in requested if did not in success]
+            self._subscriptions[ws].update(success)
+            await ws.send_json(
+                {
+                    "cmd": "subscribe_res",
+                    "data": {
+                        "success": [{"did": did} for did in success],
+                        "failed": [{"did": did} for did in failed],
+                    },
+                }
+            )
+        elif command == "c2s_read":
+            if data.get("did") in self._subscriptions[ws]:
+                await self._notify(ws, data["did"])
+        elif command == "ping":
+            self.pings += 1
+            await ws.send_json({"cmd": "pong"})
+        else:
+            await ws.send_json({"cmd": "s2c_invalid_msg", "data": {"error_code": 1009, "msg": f"unknown cmd {command}"}})
+
+    async def _notify(self, ws: web.WebSocketResponse, raw_id: str) -> None:
+        await ws.send_json({"cmd": "s2c_noti", "data": {"did": raw_id, "attrs": dict(self.devices[raw_id])}})
+
+
+async def _wait_for(condition, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the push client")
+        await asyncio.sleep(0.05)
+
+
+async def async_self_check() -> None:
+    """Drive AwprPushClient through login, subscribe, notify and reconnect."""
+    # Ping often enough that the drop below lands between heartbeats.
+    awpr_push.AWPR_PUSH_HEARTBEAT_SECONDS = 0.2
+    server = GizwitsPushStandIn({"dev1": {"POWERSW": 0, "FLAME": 1}, "dev2": {"POWERSW": 0}}, unsubscribable={"dev2"})
+    await server.async_start()
+    received: list[tuple[str, dict[str, Any]]] = []
+    async with aiohttp.ClientSession() as session:
+        backend = AwprBackend(session, "user", "password")
+        backend.token, backend.uid, backend.token_expiry = TOKEN, "uid", int(time.time()) + 3600
+        client = AwprPushClient(
+            backend,
+            "127.0.0.1",
+            server.port,
+            ["dev1", "dev2"],
+            lambda raw_id, attrs: received.append((raw_id, attrs)),
+            lambda: None,
+            scheme="ws",
+        )
+        client.start()
+        try:
+            await _wait_for(lambda: client.connected and received)
+            assert client.is_subscribed("dev1"), "dev1 should be subscribed"
+            assert not client.is_subscribed("dev2"), "dev2 failed to subscribe and must keep polling"
+            assert received[0] == ("dev1", {"POWERSW": 0, "FLAME": 1}), received
+            print("login, subscribe and initial read: ok")
+
+            await server.async_push("dev1", {"POWERSW": 1})
+            await _wait_for(lambda: received[-1][1].get("POWERSW") == 1)
+            print("status notification: ok")
+
+            await _wait_for(lambda: server.pings > 0)
+            print("heartbeat: ok")
+
+            await server.async_drop()
+            await _wait_for(lambda: not client.connected)
+            await _wait_for(lambda: client.connected and server.logins == 2)
+            print("reconnect after a dropped connection: ok")
+        finally:
+            await client.async_stop()
+    await server.async_stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", action="store_true", help="serve until interrupted instead of self-checking")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.serve else logging.INFO)
+
+    if not args.serve:
+        asyncio.run(async_self_check())
+        return
+
+    async def serve() -> None:
+        server = GizwitsPushStandIn({"dev1": {"POWERSW": 0, "FLAME": 1}})
+        await server.async_start(port=args.port)
+        print(f"Gizwits push stand-in on ws://127.0.0.1:{server.port}{WS_PATH} (token {TOKEN!r})")
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()